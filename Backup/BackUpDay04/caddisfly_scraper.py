@@ -3,12 +3,23 @@ from bs4 import BeautifulSoup, Tag
 from typing import Dict, List, Any
 import re
 
+# Prefer the C-backed lxml parser; fall back to the pure-Python parser if it is not installed
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 # --- Configuration ---
 WIKI_URL = "https://en.wikipedia.org/wiki/Caddisfly"
 TAXONOMY_SECTION_ID = "TAXONOMY" 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
+# Wikipedia footnotes, non-breaking spaces, separators and "edit" links removed before parsing
+CLEANUP_PATTERN = re.compile(r'\[.*?\]|\xa0|·|\s*edit\s*', re.IGNORECASE)
+# A (stripped) line that starts with one of the taxonomic ranks we track
+RANK_LINE_PATTERN = re.compile(r'^[^\S\n]*(suborder|superfamily|family)[^\n]*', re.IGNORECASE | re.MULTILINE)
 
 # --- Web Scraping Function (Confirmed Working) ---
 
@@ -20,7 +31,7 @@ def fetch_taxonomy_data(url: str) -> str:
     try:
         response = requests.get(url, headers=HEADERS, timeout=10)
         response.raise_for_status() 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, HTML_PARSER)
         
         start_element = None
         taxonomy_heading_span = soup.find('span', {'id': re.compile(TAXONOMY_SECTION_ID, re.IGNORECASE)})
@@ -75,47 +86,52 @@ def fetch_taxonomy_data(url: str) -> str:
 def parse_trichoptera_data(raw_text: str) -> Dict[str, Dict[str, List[str]]]:
     """
     Parses the raw text extracted from the webpage into a structured dictionary.
+    Rank lines are located with one precompiled multiline regex; a rank whose name
+    is on the following line consumes that line, exactly like the old line-by-line loop.
     """
     TRICHOPTERA_FAMILIES = {}
     current_suborder = None
     current_superfamily = None
     
-    cleaned_text = re.sub(r'\[.*?\]|\xa0|·|\s*edit\s*', '', raw_text, flags=re.IGNORECASE)
-    lines = cleaned_text.split('\n')
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        i += 1 
-        if not line:
-            continue
-            
+    cleaned_text = CLEANUP_PATTERN.sub('', raw_text)
+    consumed_until = 0 # Offset just past the last line that was consumed as a rank name
+
+    def read_next_line(offset: int):
+        """Returns the stripped line following the one ending at `offset`, and where it ends."""
+        if offset >= len(cleaned_text):
+            return None, offset
+        end = cleaned_text.find('\n', offset + 1)
+        if end == -1:
+            end = len(cleaned_text)
+        return cleaned_text[offset + 1:end].strip(), end
+
+    for match in RANK_LINE_PATTERN.finditer(cleaned_text):
+        if match.start() < consumed_until:
+            continue # This line was already used as the name of the previous rank
+
+        line = match.group(0).strip()
         line_lower = line.lower()
+        rank = match.group(1).lower()
         
-        if line_lower.startswith("suborder"):
+        if rank == "suborder":
             current_suborder = None
             if len(line.split()) > 1:
                 current_suborder = line.split(maxsplit=1)[1].strip()
-            elif i < len(lines):
-                current_suborder = lines[i].strip()
-                i += 1 
+            else:
+                current_suborder, consumed_until = read_next_line(match.end())
             
             if current_suborder and current_suborder not in TRICHOPTERA_FAMILIES:
                 TRICHOPTERA_FAMILIES[current_suborder] = {}
             current_superfamily = None
             
-        elif line_lower.startswith("superfamily"):
+        elif rank == "superfamily":
             current_superfamily = None
             is_fossil_rank = '†' in line
             
             if len(line.split()) > 1 and line_lower != "superfamily" and line_lower != "superfamily †":
-                superfamily_name = line.split(maxsplit=1)[1].strip()
-                current_superfamily = superfamily_name
-                     
-            elif i < len(lines):
-                superfamily_base_name = lines[i].strip()
-                current_superfamily = superfamily_base_name
-                i += 1 
+                current_superfamily = line.split(maxsplit=1)[1].strip()
+            else:
+                current_superfamily, consumed_until = read_next_line(match.end())
 
             if current_superfamily and is_fossil_rank and '†' not in current_superfamily:
                  current_superfamily += '†'
@@ -124,19 +140,20 @@ def parse_trichoptera_data(raw_text: str) -> Dict[str, Dict[str, List[str]]]:
                 if current_superfamily not in TRICHOPTERA_FAMILIES[current_suborder]:
                     TRICHOPTERA_FAMILIES[current_suborder][current_superfamily] = []
         
-        elif line_lower.startswith("family"):
-            if i < len(lines) and current_suborder and current_superfamily:
-                family_base_name = lines[i].strip()
-                family_name = family_base_name
-                is_fossil_rank = '†' in line
-                
-                if is_fossil_rank and '†' not in family_name:
-                    family_name = family_base_name + '†'
+        elif current_suborder and current_superfamily:
+            family_base_name, next_offset = read_next_line(match.end())
+            if family_base_name is None:
+                continue
+            consumed_until = next_offset
+            family_name = family_base_name
+            is_fossil_rank = '†' in line
+            
+            if is_fossil_rank and '†' not in family_name:
+                family_name = family_base_name + '†'
+            
+            if family_name not in TRICHOPTERA_FAMILIES[current_suborder][current_superfamily]:
+                TRICHOPTERA_FAMILIES[current_suborder][current_superfamily].append(family_name)
                 
-                if family_name not in TRICHOPTERA_FAMILIES[current_suborder][current_superfamily]:
-                    TRICHOPTERA_FAMILIES[current_suborder][current_superfamily].append(family_name)
-                    
-                i += 1
     return TRICHOPTERA_FAMILIES
 
 # --- EXPORT FUNCTION ---
@@ -1,20 +1,94 @@
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Tuple, Optional
 import re
+import string
+from functools import lru_cache
 import os
 from pathlib import Path
 import time
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+import json
+from datetime import date
 from caddisfly_scraper import get_caddisfly_family_names 
 
+# requests-cache keeps NCBI replies on disk between runs; it is optional
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
 # --- Configuration ---
-NCBI_BASE_URL = "https://www.ncbi.nlm.nih.gov/protein/"
 NCBI_EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+NCBI_ESEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+NCBI_ESUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 FIBROIN_TERM = "fibroin"
 OUTPUT_ROOT_DIR = "ncbi_fibroin_sequences" # Root folder for all output
+REQUEST_DELAY = 0.5 # Base retry backoff
+REQUESTS_PER_SECOND = 3 # NCBI's rate limit without an API key, shared by all workers
+ESEARCH_RETMAX = 500 # Maximum number of search hits requested per family
+EFETCH_BATCH_SIZE = 200 # NCBI recommends POST once an Efetch id list grows beyond ~200 entries
+MAX_RETRIES = 4 # Retries per request when NCBI throttles us or has a transient server error
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_FAMILY_WORKERS = 4 # Families searched concurrently; LIMITER paces all of their calls together
+MAX_WRITE_WORKERS = 16 # Concurrent file writes when saving results (bounded to avoid fd exhaustion)
+RESULTS_CACHE_FILE = f"ncbi_results_{FIBROIN_TERM}_{date.today().isoformat()}.json" # Today's scraped results
+
+# --- Request Pacing ---
+
+class RateLimiter:
+    """
+    Spaces out request start times so that at most `requests_per_second` requests begin each second.
+    Thread-safe: every worker reserves the next free slot under a lock and sleeps until it arrives.
+    """
+    def __init__(self, requests_per_second: float):
+        self.min_interval = 1.0 / requests_per_second
+        self.next_ok = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until the caller may send its request."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_ok)
+            self.next_ok = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+LIMITER = RateLimiter(REQUESTS_PER_SECOND)
+
+# One keep-alive session for every NCBI call, so TCP/TLS connections are reused instead of
+# re-established per request. Only this session is cached (reruns answer NCBI requests from sqlite),
+# so other modules' requests are left alone
+if requests_cache:
+    SESSION = requests_cache.CachedSession(
+        'ncbi_http_cache',
+        backend='sqlite',
+        expire_after=7 * 24 * 3600, # Efetch/ESummary replies carry no Cache-Control, so use a fixed TTL
+        cache_control=True,
+        allowable_methods=('GET', 'POST') # Large id lists are POSTed
+    )
+else:
+    SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=MAX_RETRIES,
+        backoff_factor=REQUEST_DELAY, # Exponential backoff, honouring Retry-After when NCBI sends it
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({'GET', 'POST'}) # E-utilities POSTs are read-only, so safe to retry
+    )
+))
 
 # --- Classification Constants ---
 CHAIN_TYPES = {
@@ -22,45 +96,102 @@ CHAIN_TYPES = {
     'light chain': ['light chain', 'fib-l', 'l-fibroin', 'l chain'],
     'others': [] # Default if no match is found
 }
+# One compiled pattern per chain type, checked in CHAIN_TYPES order so heavy chain keeps priority
+CHAIN_PATTERNS = {
+    chain_type: re.compile('|'.join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+    for chain_type, keywords in CHAIN_TYPES.items()
+    if keywords
+}
 # Define the nested structure for results
 EMPTY_CHAIN_STRUCTURE = {
     'heavy chain': [],
     'light chain': [],
     'others': []
 }
+# Column order of the per-family counts in the summary index
+SUMMARY_COLUMN_KEYS = [
+    ('full sequence', 'heavy chain'),
+    ('full sequence', 'light chain'),
+    ('full sequence', 'others'),
+    ('partial sequence', 'heavy chain'),
+    ('partial sequence', 'light chain'),
+    ('partial sequence', 'others'),
+]
 # The final result structure will now be nested:
 # {Family: {'full sequence': EMPTY_CHAIN_STRUCTURE, 'partial sequence': EMPTY_CHAIN_STRUCTURE}}
 
 
+@dataclass(slots=True)
+class SeqRecord:
+    """One downloaded protein record (slots keep thousands of them compact in memory)."""
+    id: str
+    name: str
+    sequence: str
+
+
+# Byte tables for sequence cleanup: drop everything except letters and '*', then upper-case
+SEQUENCE_UPPER_TABLE = bytes.maketrans(string.ascii_lowercase.encode(), string.ascii_uppercase.encode())
+SEQUENCE_DELETE_CHARS = bytes(c for c in range(256) if chr(c) not in string.ascii_letters + '*')
+
+# Characters that are not allowed in file or directory names
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|]')
+
+# FASTA line width, and a pattern matching each full line's worth of residues
+FASTA_LINE_WIDTH = 60
+FASTA_LINE_PATTERN = re.compile(f'(.{{{FASTA_LINE_WIDTH}}})')
+
 # --- Utility Functions ---
 
+@lru_cache(maxsize=4096)
 def safe_filename(name: str, max_len=50) -> str:
-    """Generates a safe filename from a string."""
-    safe_name = re.sub(r'[\\/:*?"<>|]', '', name).strip()
+    """Generates a safe filename from a string (memoized, the same names recur for every sequence)."""
+    safe_name = UNSAFE_FILENAME_CHARS.sub('', name).strip()
     safe_name = safe_name.replace(' ', '_')
     return safe_name[:max_len]
 
 
+def clean_sequence(sequence_body: str) -> str:
+    """
+    Returns the upper-cased residues of a FASTA body, dropping newlines and any non A-Z/'*' characters.
+    A single bytes.translate pass replaces the old upper() + re.sub pair.
+    """
+    raw = sequence_body.encode('ascii', 'ignore')
+    return raw.translate(SEQUENCE_UPPER_TABLE, SEQUENCE_DELETE_CHARS).decode('ascii')
+
+
+def wrap_fasta(sequence: str) -> str:
+    """Breaks a sequence into FASTA_LINE_WIDTH-residue lines with a single regex substitution."""
+    return FASTA_LINE_PATTERN.sub('\\1\n', sequence).rstrip('\n')
+
+
 def classify_protein_chain(name: str) -> str:
     """
     Classifies a protein based on its name into 'heavy chain', 'light chain', or 'others'.
     """
-    name_lower = name.lower()
-    for chain_type, keywords in CHAIN_TYPES.items():
-        if chain_type == 'others':
-            continue
-        for keyword in keywords:
-            if keyword in name_lower:
-                return chain_type
+    for chain_type, pattern in CHAIN_PATTERNS.items():
+        if pattern.search(name):
+            return chain_type
     return 'others'
 
 
 # --- Core Scraper Functions (Updated) ---
 
-def fetch_protein_sequence(accession_id: str) -> str:
+def request_with_retry(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Issues an HTTP request on the shared SESSION, paced by LIMITER so all threads together stay
+    within NCBI's rate limit. The adapter retries with exponential backoff when NCBI throttles
+    us or fails transiently (RETRY_STATUS_CODES).
+    """
+    LIMITER.acquire()
+    response = SESSION.request(method, url, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+def fetch_protein_sequence(accession_id: str) -> Optional[str]:
     """
     Fetches the protein sequence using NCBI E-utilities (Efetch) for reliable FASTA output.
-    (This function remains robust and unchanged from the previous version)
+    Returns "" if NCBI has no sequence for the accession, and None if the request failed.
     """
     params = {
         'db': 'protein',
@@ -70,8 +201,7 @@ def fetch_protein_sequence(accession_id: str) -> str:
     }
     
     try:
-        response = requests.get(NCBI_EUTILS_BASE_URL, headers=HEADERS, params=params, timeout=15)
-        response.raise_for_status()
+        response = request_with_retry('GET', NCBI_EUTILS_BASE_URL, params=params, timeout=15)
         content = response.text.strip()
 
         if not content.startswith('>'):
@@ -82,60 +212,172 @@ def fetch_protein_sequence(accession_id: str) -> str:
         if first_newline_index == -1:
             return ""
 
-        sequence_body = content[first_newline_index + 1:].upper()
-        sequence = re.sub(r'[^A-Z*]', '', sequence_body)
+        sequence = clean_sequence(content[first_newline_index + 1:])
             
         return sequence
 
     except requests.exceptions.RequestException as e:
         print(f"    ERROR: Could not fetch sequence for {accession_id} using E-utilities: {e}")
-        return ""
+        return None
     except Exception as e:
         print(f"    ERROR: Unexpected error during E-utilities fetch for {accession_id}: {e}")
-        return ""
+        return None
 
 
-def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
+def fetch_and_parse_search_results(query: str) -> Optional[List[Tuple[str, str]]]:
     """
     Searches NCBI Protein database and extracts accession ID and name for each result.
-    (This function remains robust and unchanged from the previous version)
+    Uses E-utilities ESearch (matching UIDs) and ESummary (accession + title) JSON endpoints,
+    which are far smaller than the rendered search page and need no HTML parsing.
+    Returns None (not an empty list) if the search failed, so callers can tell it from no hits.
     """
-    search_url = f"{NCBI_BASE_URL}?term={query}"
-    
     print(f"  Searching NCBI for: '{query}'...")
     try:
-        response = requests.get(search_url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        results = set()
-        title_links = soup.select('a.pr-link, a.title, a[href^="/protein/"], a[data-entity-id]')
+        search_params = {
+            'db': 'protein',
+            'term': query,
+            'retmode': 'json',
+            'retmax': ESEARCH_RETMAX
+        }
+        response = request_with_retry('GET', NCBI_ESEARCH_URL, params=search_params, timeout=15)
+        uids = response.json()['esearchresult']['idlist']
 
-        for link in title_links:
-            href = link.get('href')
-            protein_name = link.get_text(strip=True)
-            
-            if href and protein_name:
-                match = re.search(r'/protein/([A-Z]{1,3}\d+\.?\d*)', href)
-                
-                if match:
-                    accession_id = match.group(1)
-                    if protein_name.upper() != accession_id.upper() and accession_id not in protein_name:
-                        results.add((accession_id, protein_name))
-        
-        return list(results)
+        if not uids:
+            return []
+
+        summary_data = {
+            'db': 'protein',
+            'id': ','.join(uids),
+            'retmode': 'json'
+        }
+        method = 'POST' if len(uids) > EFETCH_BATCH_SIZE else 'GET'
+        request_args = {'data': summary_data} if method == 'POST' else {'params': summary_data}
+        response = request_with_retry(method, NCBI_ESUMMARY_URL, timeout=30, **request_args)
+        summaries = response.json()['result']
+
+        results = []
+        for uid in summaries.get('uids', uids):
+            entry = summaries.get(uid, {})
+            accession_id = entry.get('accessionversion')
+            protein_name = entry.get('title')
+            if accession_id and protein_name:
+                results.append((accession_id, protein_name))
+
+        return results
 
     except requests.exceptions.RequestException as e:
         print(f"  ERROR: Could not fetch search results for '{query}': {e}")
-        return []
+        return None
     except Exception as e:
         print(f"  ERROR: An unexpected error occurred during search for '{query}': {e}")
-        return []
+        return None
+
+
+def fetch_protein_sequences_batch(accession_ids: List[str]) -> Dict[str, str]:
+    """
+    Fetches many protein sequences with a single Efetch call and returns them keyed by accession ID.
+    Both the versioned ('BAF62092.2') and unversioned ('BAF62092') forms are keys, so lookups work
+    whichever form the search page produced.
+    """
+    if not accession_ids:
+        return {}
+
+    data = {
+        'db': 'protein',
+        'id': ','.join(accession_ids),
+        'rettype': 'fasta',
+        'retmode': 'text'
+    }
+    # Long id lists do not fit in a URL, so NCBI asks for them to be POSTed
+    method = 'POST' if len(accession_ids) > EFETCH_BATCH_SIZE else 'GET'
+    request_args = {'data': data} if method == 'POST' else {'params': data}
+
+    try:
+        response = request_with_retry(method, NCBI_EUTILS_BASE_URL, timeout=60, **request_args)
+    except requests.exceptions.RequestException as e:
+        print(f"    ERROR: Could not fetch sequences for {len(accession_ids)} accessions using E-utilities: {e}")
+        return {}
+
+    sequences = {}
+    # Multi-FASTA: every record starts with a '>' header line whose first token is the accession
+    for record in response.text.strip().lstrip('>').split('\n>'):
+        header, _, body = record.partition('\n')
+        if not header or not body:
+            continue
+        accession_id = header.split(maxsplit=1)[0]
+        sequence = clean_sequence(body)
+        sequences[accession_id] = sequence
+        sequences.setdefault(accession_id.split('.')[0], sequence)
+
+    return sequences
+
+
+def _process_family(family: str) -> Tuple[str, Dict[str, Dict[str, List[SeqRecord]]], bool]:
+    """
+    Searches NCBI for one family's fibroin records, fetches their sequences and classifies them.
+    Returns (family, {seq_type: {chain_type: [SeqRecord, ...]}}, complete), where complete is
+    False if any request for the family failed.
+    """
+    print(f"Step 2: Processing Family: {family}")
+    search_query = f"{family} {FIBROIN_TERM}"
+    
+    # Initialize storage with the new nested structure
+    family_results = {
+        'full sequence': {k: [] for k in CHAIN_TYPES.keys()},
+        'partial sequence': {k: [] for k in CHAIN_TYPES.keys()}
+    }
+    
+    protein_records = fetch_and_parse_search_results(search_query)
+    
+    if protein_records is None:
+        return family, family_results, False
+    if not protein_records:
+        print(f"  No protein records found for {family}.")
+        return family, family_results, True
+        
+    print(f"  Found {len(protein_records)} records for {family}. Fetching sequences...")
+
+    # One Efetch round-trip for the whole family instead of one per accession
+    sequences = fetch_protein_sequences_batch([record_id for record_id, _ in protein_records])
+
+    # Records the batch reply did not key by their accession (e.g. 'sp|...|' or 'pdb|...|' headers,
+    # or a different version) are fetched one by one, as before batching
+    complete = True
+    for record_id, _ in protein_records:
+        if not (sequences.get(record_id) or sequences.get(record_id.split('.')[0])):
+            sequence = fetch_protein_sequence(record_id)
+            if sequence is None:
+                complete = False
+            sequences[record_id] = sequence or ""
+
+    for record_id, record_name in protein_records:
+        sequence = sequences.get(record_id) or sequences.get(record_id.split('.')[0])
+        
+        if not sequence:
+            continue
 
+        # 1. Determine sequence type (Full or Partial)
+        is_partial = 'partial' in record_name.lower()
+        seq_type = 'partial sequence' if is_partial else 'full sequence'
+        
+        # 2. Determine chain type (Heavy, Light, Other)
+        chain_type = classify_protein_chain(record_name)
+        
+        # Save data into the correct nested list
+        family_results[seq_type][chain_type].append(SeqRecord(record_id, record_name, sequence))
+    
+    full_count = sum(len(v) for v in family_results['full sequence'].values())
+    partial_count = sum(len(v) for v in family_results['partial sequence'].values())
+    
+    print(f"  Finished {family}. Results: Full ({full_count}), Partial ({partial_count}).")
+    return family, family_results, complete
 
-def main_scraper() -> Dict[str, Dict[str, Dict[str, List[Dict[str, str]]]]]:
+
+def main_scraper() -> Tuple[Dict[str, Dict[str, Dict[str, List[SeqRecord]]]], bool]:
     """
     Executes the full scraping process with the new nested classification logic.
+    Families are processed concurrently (the work is network-bound), MAX_FAMILY_WORKERS at a time.
+    Returns the results and whether every request succeeded (only then may they be cached).
     """
     print("--- Starting NCBI Fibroin Scraper ---")
     print("Step 1: Fetching Caddisfly family names...")
@@ -144,93 +386,86 @@ def main_scraper() -> Dict[str, Dict[str, Dict[str, List[Dict[str, str]]]]]:
     
     if not caddisfly_families:
         print("ERROR: Could not retrieve a list of Caddisfly families. Aborting.")
-        return {}
+        return {}, False
 
     families_to_process = caddisfly_families
     
     print(f"Successfully retrieved {len(caddisfly_families)} families.")
     print("-" * 40)
     
-    final_results = {}
+    results_by_family = {}
+    all_complete = True
     
-    for family in families_to_process:
-        print(f"Step 2: Processing Family: {family}")
-        search_query = f"{family} {FIBROIN_TERM}"
+    with ThreadPoolExecutor(max_workers=MAX_FAMILY_WORKERS) as executor:
+        futures = [executor.submit(_process_family, family) for family in families_to_process]
+        for future in as_completed(futures):
+            family, family_results, complete = future.result()
+            results_by_family[family] = family_results
+            all_complete = all_complete and complete
+
+    print("-" * 40)
+    # Keep the families in the order they were listed, not the order they finished
+    final_results = {family: results_by_family[family] for family in families_to_process}
         
-        # Initialize storage with the new nested structure
-        final_results[family] = {
-            'full sequence': {k: [] for k in CHAIN_TYPES.keys()},
-            'partial sequence': {k: [] for k in CHAIN_TYPES.keys()}
+    return final_results, all_complete
+
+def load_cached_results() -> Dict[str, Dict[str, Dict[str, List[SeqRecord]]]]:
+    """Loads today's scraped results from RESULTS_CACHE_FILE, or returns {} if there are none."""
+    cache_path = Path(RESULTS_CACHE_FILE)
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return {
+            family: {
+                seq_type: {
+                    chain_type: [SeqRecord(**record) for record in records]
+                    for chain_type, records in chain_types.items()
+                }
+                for seq_type, chain_types in seq_types.items()
+            }
+            for family, seq_types in cached.items()
         }
-        
-        protein_records = fetch_and_parse_search_results(search_query)
-        
-        if not protein_records:
-            print(f"  No protein records found for {family}.")
-            print("-" * 40)
-            continue
-            
-        print(f"  Found {len(protein_records)} records. Fetching sequences...")
+    except (OSError, ValueError, TypeError) as e:
+        print(f"WARNING: Ignoring unreadable results cache {cache_path}: {e}")
+        return {}
 
-        for record_id, record_name in protein_records:
-            time.sleep(0.5) 
-            
-            sequence = fetch_protein_sequence(record_id)
-            
-            if not sequence:
-                continue
 
-            # 1. Determine sequence type (Full or Partial)
-            is_partial = 'partial' in record_name.lower()
-            seq_type = 'partial sequence' if is_partial else 'full sequence'
-            
-            # 2. Determine chain type (Heavy, Light, Other)
-            chain_type = classify_protein_chain(record_name)
-            
-            sequence_data = {
-                'id': record_id,
-                'name': record_name,
-                'sequence': sequence
-            }
-            
-            # Save data into the correct nested list
-            final_results[family][seq_type][chain_type].append(sequence_data)
-        
-        full_count = sum(len(v) for v in final_results[family]['full sequence'].values())
-        partial_count = sum(len(v) for v in final_results[family]['partial sequence'].values())
-        
-        print(f"  Finished {family}. Results: Full ({full_count}), Partial ({partial_count}).")
-        print("-" * 40)
-        
-    return final_results
+def cache_results(results: Dict[str, Dict[str, Dict[str, List[SeqRecord]]]]):
+    """Stores the scraped results in RESULTS_CACHE_FILE so later runs today can skip the network."""
+    try:
+        with open(RESULTS_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(results, f, default=asdict) # SeqRecords are stored as plain JSON objects
+    except OSError as e:
+        print(f"WARNING: Could not write results cache {RESULTS_CACHE_FILE}: {e}")
 
 # --- Output Generation Functions (NEW/Updated) ---
 
-def generate_sequence_markdown(data: Dict[str, str], chain_type: str, seq_type: str) -> str:
-    """Creates human-readable Markdown content for a single sequence file."""
+def generate_sequence_markdown(data: SeqRecord, chain_type: str, seq_type: str) -> str:
+    """Creates a human-readable Markdown section for a single sequence in its family file."""
     
-    sequence_lines = '\n'.join([data['sequence'][i:i+60] for i in range(0, len(data['sequence']), 60)])
+    sequence_lines = wrap_fasta(data.sequence)
     
-    return f"""# Fibroin Sequence Details
+    return f"""## {data.id}
 
 | Key | Value |
 | :--- | :--- |
-| **Accession ID** | `{data['id']}` |
-| **Full Name** | `{data['name']}` |
+| **Accession ID** | `{data.id}` |
+| **Full Name** | `{data.name}` |
 | **Sequence Type** | `{seq_type.title()}` |
 | **Chain Classification** | `{chain_type.title()}` |
-| **Length (Residues)** | `{len(data['sequence'])}` |
-
----
-
-## Protein Sequence (FASTA Format)
+| **Length (Residues)** | `{len(data.sequence)}` |
 
-The sequence below is displayed in FASTA format for easy reading and copy-pasting into alignment tools.
+### Protein Sequence (FASTA Format)
 
 ```fasta
->{data['id']} {data['name']}
+>{data.id} {data.name}
 {sequence_lines}
 ```
+
+---
+
 """
 
 
@@ -255,26 +490,23 @@ def generate_summary_index(results: Dict, root_dir: str):
 
     for family, seq_types in sorted(results.items()):
         
-        # Get counts for all six sub-categories
-        full_heavy = len(seq_types['full sequence']['heavy chain'])
-        full_light = len(seq_types['full sequence']['light chain'])
-        full_other = len(seq_types['full sequence']['others'])
-        
-        partial_heavy = len(seq_types['partial sequence']['heavy chain'])
-        partial_light = len(seq_types['partial sequence']['light chain'])
-        partial_other = len(seq_types['partial sequence']['others'])
-        
-        family_total = sum([full_heavy, full_light, full_other, partial_heavy, partial_light, partial_other])
+        # Count all six sub-categories in a single pass over the family's dict
+        counts = {
+            (seq_type, chain_type): len(sequences)
+            for seq_type, chain_types in seq_types.items()
+            for chain_type, sequences in chain_types.items()
+        }
+        family_total = sum(counts.values())
         total_sequences += family_total
 
         # Append row to the table
-        row = f"| {family} | **{family_total}** | {full_heavy} | {full_light} | {full_other} | {partial_heavy} | {partial_light} | {partial_other} |"
-        content.append(row)
+        cells = [family, f"**{family_total}**", *[str(counts.get(key, 0)) for key in SUMMARY_COLUMN_KEYS]]
+        content.append(f"| {' | '.join(cells)} |")
 
     content.append("")
     content.append("---")
     content.append(f"## GRAND TOTAL SEQUENCES DOWNLOADED: **{total_sequences}**")
-    content.append(f"\nAll sequences are saved in the `{root_dir}` folder, organized by family, sequence type, and chain type.")
+    content.append(f"\nAll sequences are saved in the `{root_dir}` folder, with one FASTA and one Markdown file per family.")
     
     try:
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -284,77 +516,69 @@ def generate_summary_index(results: Dict, root_dir: str):
         print(f"ERROR: Could not write summary index file: {e}")
 
 
-def save_results_to_files(results: Dict[str, Dict[str, Dict[str, List[Dict[str, str]]]]]):
+def write_text_file(file_path: Path, content: str) -> bool:
+    """Writes a single output file, returning False (and reporting the error) if it could not be saved."""
+    try:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return True
+    except Exception as e:
+        print(f"    ERROR: Could not write file {file_path.name}: {e}")
+        return False
+
+
+def save_results_to_files(results: Dict[str, Dict[str, Dict[str, List[SeqRecord]]]]):
     """
-    Creates the nested folder structure and saves all sequences into both FASTA and Markdown files.
+    Saves each family's sequences into one multi-record FASTA file and one Markdown file.
+    Every FASTA header carries a [sequence type|chain type] tag, and every Markdown
+    section records the same classification, so no per-sequence folders are needed.
     """
     print("\n" + "="*80)
-    print(f"Step 3: Creating nested directories and saving sequences to: '{OUTPUT_ROOT_DIR}'")
-    print("Files will be saved in dual format: .fasta (for tools) and .md (for reading).")
+    print(f"Step 3: Creating family directories and saving sequences to: '{OUTPUT_ROOT_DIR}'")
+    print("Each family is saved in dual format: one .fasta (for tools) and one .md (for reading).")
     print("="*80)
     
     root_dir = Path(OUTPUT_ROOT_DIR)
     root_dir.mkdir(exist_ok=True)
     
-    total_files_saved = 0
+    file_paths = []
+    file_contents = []
     
     for family, seq_types in results.items():
         family_dir = root_dir / safe_filename(family)
         family_dir.mkdir(exist_ok=True)
         print(f"Created family directory: {family_dir}")
 
+        fasta_buffer = io.StringIO()
+        markdown_buffer = io.StringIO()
+        markdown_buffer.write(f"# {family} Fibroin Sequences\n\n")
+
         for seq_type, chain_types in seq_types.items():
             # seq_type is 'full sequence' or 'partial sequence'
-            type_dir = family_dir / safe_filename(seq_type)
-            type_dir.mkdir(exist_ok=True)
-            
             for chain_type, sequences in chain_types.items():
                 # chain_type is 'heavy chain', 'light chain', or 'others'
-                chain_dir = type_dir / safe_filename(chain_type)
-                chain_dir.mkdir(exist_ok=True)
-                
-                print(f"  Created structure: {chain_dir}")
-                
-                if not sequences:
-                    # print(f"  No sequences in '{chain_type}' for '{seq_type}' in {family}.")
-                    continue
-                
                 for data in sequences:
-                    # 1. Prepare FASTA Content
-                    fasta_header = f">{data['id']} {data['name']}"
-                    # Sequence split into lines of 60 characters
-                    fasta_sequence = '\n'.join([data['sequence'][i:i+60] for i in range(0, len(data['sequence']), 60)])
-                    fasta_content = f"{fasta_header}\n{fasta_sequence}\n"
-                    
-                    # 2. Prepare Markdown Content (Word substitute)
-                    markdown_content = generate_sequence_markdown(data, chain_type, seq_type)
-                    
-                    # Generate a unique, safe filename using Accession ID
-                    final_filename_base = f"{data['id']}_{safe_filename(data['name'], 30)}"
-                    
-                    # Save FASTA file
-                    fasta_file_path = chain_dir / f"{final_filename_base}.fasta"
-                    try:
-                        with open(fasta_file_path, 'w', encoding='utf-8') as f:
-                            f.write(fasta_content)
-                        total_files_saved += 1
-                    except Exception as e:
-                        print(f"    ERROR: Could not write FASTA file {fasta_file_path.name}: {e}")
-
-                    # Save Markdown file
-                    markdown_file_path = chain_dir / f"{final_filename_base}.md"
-                    try:
-                        with open(markdown_file_path, 'w', encoding='utf-8') as f:
-                            f.write(markdown_content)
-                        total_files_saved += 1
-                    except Exception as e:
-                        print(f"    ERROR: Could not write Markdown file {markdown_file_path.name}: {e}")
+                    # FASTA is concatenable: each '>' header line starts a new record
+                    fasta_buffer.write(f">{data.id} [{seq_type}|{chain_type}] {data.name}\n{wrap_fasta(data.sequence)}\n")
+                    markdown_buffer.write(generate_sequence_markdown(data, chain_type, seq_type))
+
+        if not fasta_buffer.tell():
+            continue
+
+        family_file_base = safe_filename(family)
+        file_paths.append(family_dir / f"{family_file_base}.fasta")
+        file_contents.append(fasta_buffer.getvalue())
+        file_paths.append(family_dir / f"{family_file_base}.md")
+        file_contents.append(markdown_buffer.getvalue())
+
+    with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as executor:
+        total_files_saved = sum(executor.map(write_text_file, file_paths, file_contents))
 
     # Generate the Index after saving all files
     generate_summary_index(results, OUTPUT_ROOT_DIR)
 
     print("\n" + "="*80)
-    print(f"--- SUCCESS: Operation Complete. Total {total_files_saved} individual files saved (FASTA and MD). ---")
+    print(f"--- SUCCESS: Operation Complete. Total {total_files_saved} family files saved (FASTA and MD). ---")
     print(f"Find your structured data and index in the '{OUTPUT_ROOT_DIR}' folder.")
     print("="*80)
 
@@ -375,8 +599,17 @@ if __name__ == "__main__":
         exit()
 
     try:
-        # Run the scraper to get structured data
-        results = main_scraper()
+        # Reuse today's results if we already scraped them, otherwise run the scraper
+        results = load_cached_results()
+        if results:
+            print(f"Loaded cached results from '{RESULTS_CACHE_FILE}'.")
+        else:
+            results, complete = main_scraper()
+            # Results with holes left by failed requests are not cached, so the next run retries them
+            if complete:
+                cache_results(results)
+            else:
+                print(f"WARNING: Some NCBI requests failed; results were not cached to '{RESULTS_CACHE_FILE}'.")
         
         # Save the results to the local file system
         save_results_to_files(results)
@@ -1,57 +1,197 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 from typing import List, Dict, Tuple
 import re
+import html
+import io
 import os
 from pathlib import Path
 import time
+import threading
+from functools import partial, lru_cache
+from xml.etree import ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple, Counter, OrderedDict
+from itertools import groupby
 from caddisfly_scraper import get_caddisfly_family_names 
 
+# Prefer the C-backed lxml parser; fall back to the pure-Python parser if it is not installed
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# selectolax's Lexbor engine is much faster than BeautifulSoup for the search page; it is optional
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
 # --- Configuration ---
 NCBI_BASE_URL = "https://www.ncbi.nlm.nih.gov/protein/"
 NCBI_EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+NCBI_EPOST_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/epost.fcgi"
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 FIBROIN_TERM = "fibroin"
 OUTPUT_ROOT_DIR = "ncbi_fibroin_sequences" # Root folder for all output
 
+# Optional NCBI API key (and contact e-mail): with a key E-utilities allow 10 requests/second instead of 3
+NCBI_API_KEY = os.environ.get('NCBI_API_KEY')
+NCBI_EMAIL = os.environ.get('NCBI_EMAIL')
+NCBI_IDENTITY_PARAMS = {'tool': 'fibroin_scraper'} # Sent with every E-utilities call
+if NCBI_API_KEY:
+    NCBI_IDENTITY_PARAMS['api_key'] = NCBI_API_KEY
+if NCBI_EMAIL:
+    NCBI_IDENTITY_PARAMS['email'] = NCBI_EMAIL
+
+REQUESTS_PER_SECOND = 10 if NCBI_API_KEY else 3 # NCBI's rate limit, shared by all workers
+MAX_FETCH_WORKERS = REQUESTS_PER_SECOND # Concurrent NCBI requests
+EFETCH_BATCH_SIZE = 200 # Sequences returned per EFetch call from the posted id list
+MAX_WRITE_WORKERS = 16 # Concurrent file writes when saving results
+CONNECT_TIMEOUT = 5 # Seconds to establish a connection; the read timeout is given per call
+SEQ_CACHE_MAX_ENTRIES = 5000 # Sequences kept in memory; the least recently used are dropped first
+
+
+class BoundedCache(OrderedDict):
+    """
+    Dict that keeps at most `max_entries` items, evicting the least recently stored or read one first.
+    Thread-safe for the single get/set/update calls the download workers make.
+    """
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while len(self) > self.max_entries:
+                self.popitem(last=False)
+
+    def get(self, key, default=None):
+        """Returns the cached value (marking it recently used), or `default` if it is not cached."""
+        with self.lock:
+            if key not in self:
+                return default
+            self.move_to_end(key)
+            return super().__getitem__(key)
+
+
+# Sequences downloaded so far, keyed by accession ID, so records listed under several families are fetched once
+SEQ_CACHE = BoundedCache(SEQ_CACHE_MAX_ENTRIES)
+
+
+class RateLimiter:
+    """
+    Spaces out request start times so that at most `requests_per_second` requests begin each second.
+    Thread-safe: every worker reserves the next free slot under a lock and sleeps until it arrives.
+    """
+    def __init__(self, requests_per_second: float):
+        self.min_interval = 1.0 / requests_per_second
+        self.next_ok = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until the caller may send its request."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_ok)
+            self.next_ok = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+LIMITER = RateLimiter(REQUESTS_PER_SECOND)
+
+# Shared keep-alive session: connections to NCBI are reused instead of re-opened for every request,
+# and throttled (429) or transient server errors are retried with exponential backoff
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=None)
+))
+
+# Only <a href> tags are needed from the search page, so the rest of the markup is never built into the tree
+SEARCH_LINK_STRAINER = SoupStrainer('a', href=True)
+SEARCH_LINK_SELECTOR = 'a.pr-link, a.title, a[href^="/protein/"], a[data-entity-id]'
+# Plain-text protein links (<a ... href=".../protein/...">name</a>) read straight from the raw page bytes
+PROTEIN_LINK_PATTERN = re.compile(rb'<a\s[^>]*?href="([^"]*/protein/[^"]*)"[^>]*>([^<]+)</a>', re.IGNORECASE)
+# Accession ID inside a protein link, e.g. '/protein/BAF62092.2'
+ACCESSION_PATH_PATTERN = re.compile(r'/protein/([A-Z]{1,3}\d+\.?\d*)')
+
+# --- Precompiled Cleanup Patterns ---
+# Characters that are not allowed in file or directory names
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|]')
+# Anything in an (upper-cased) FASTA body that is not a residue letter or stop '*'
+NON_RESIDUE_BYTES = re.compile(rb'[^A-Z*]')
+# Each full 60-residue FASTA line, so a newline can be inserted after it in one substitution
+FASTA_LINE_PATTERN = re.compile(r'(.{60})')
+
 # --- Classification Constants ---
 CHAIN_TYPES = {
     'heavy chain': ['heavy chain', 'fib-h', 'h-fibroin', 'h chain'],
     'light chain': ['light chain', 'fib-l', 'l-fibroin', 'l chain'],
     'others': [] # Default if no match is found
 }
-# Define the nested structure for results
-EMPTY_CHAIN_STRUCTURE = {
-    'heavy chain': [],
-    'light chain': [],
-    'others': []
+# Every chain keyword mapped to its chain type, plus one alternation that finds them all in a single scan
+CHAIN_KEYWORD_TYPES = {
+    keyword: chain_type
+    for chain_type, keywords in CHAIN_TYPES.items()
+    for keyword in keywords
 }
-# The final result structure will now be nested:
-# {Family: {'full sequence': EMPTY_CHAIN_STRUCTURE, 'partial sequence': EMPTY_CHAIN_STRUCTURE}}
+CHAIN_KEYWORD_PATTERN = re.compile('|'.join(
+    re.escape(keyword) for keyword in sorted(CHAIN_KEYWORD_TYPES, key=len, reverse=True)
+))
+# Column order of the per-family counts in the summary index
+SUMMARY_COLUMN_KEYS = [
+    ('full sequence', 'heavy chain'),
+    ('full sequence', 'light chain'),
+    ('full sequence', 'others'),
+    ('partial sequence', 'heavy chain'),
+    ('partial sequence', 'light chain'),
+    ('partial sequence', 'others'),
+]
+# Sequence types, in folder order
+SEQUENCE_TYPES = ['full sequence', 'partial sequence']
+# The results are one flat list of records; each record carries its own family and classification
+SeqRecord = namedtuple('SeqRecord', 'family seq_type chain_type id name sequence')
 
 
 # --- Utility Functions ---
 
+@lru_cache(maxsize=4096)
 def safe_filename(name: str, max_len=50) -> str:
-    """Generates a safe filename from a string."""
-    safe_name = re.sub(r'[\\/:*?"<>|]', '', name).strip()
+    """Generates a safe filename from a string (memoized, the same names recur for every family)."""
+    safe_name = UNSAFE_FILENAME_CHARS.sub('', name).strip()
     safe_name = safe_name.replace(' ', '_')
     return safe_name[:max_len]
 
 
+def wrap_fasta(sequence: str) -> str:
+    """Splits a sequence into 60-character FASTA lines."""
+    return FASTA_LINE_PATTERN.sub('\\1\n', sequence).rstrip('\n')
+
+
 def classify_protein_chain(name: str) -> str:
     """
     Classifies a protein based on its name into 'heavy chain', 'light chain', or 'others'.
+    All keywords are found in one pass over the name; if both chains match, CHAIN_TYPES order wins.
     """
-    name_lower = name.lower()
-    for chain_type, keywords in CHAIN_TYPES.items():
-        if chain_type == 'others':
-            continue
-        for keyword in keywords:
-            if keyword in name_lower:
-                return chain_type
+    found_chain_types = {
+        CHAIN_KEYWORD_TYPES[match.group()]
+        for match in CHAIN_KEYWORD_PATTERN.finditer(name.lower())
+    }
+    for chain_type in CHAIN_TYPES:
+        if chain_type in found_chain_types:
+            return chain_type
     return 'others'
 
 
@@ -60,9 +200,15 @@ def classify_protein_chain(name: str) -> str:
 def fetch_protein_sequence(accession_id: str) -> str:
     """
     Fetches the protein sequence using NCBI E-utilities (Efetch) for reliable FASTA output.
-    (This function remains robust and unchanged from the previous version)
+    The reply is parsed as bytes, so the sequence is decoded only once, after cleaning.
+    Sequences already in SEQ_CACHE are returned without a request.
     """
+    cached_sequence = SEQ_CACHE.get(accession_id)
+    if cached_sequence:
+        return cached_sequence
+
     params = {
+        **NCBI_IDENTITY_PARAMS,
         'db': 'protein',
         'id': accession_id,
         'rettype': 'fasta',
@@ -70,20 +216,23 @@ def fetch_protein_sequence(accession_id: str) -> str:
     }
     
     try:
-        response = requests.get(NCBI_EUTILS_BASE_URL, headers=HEADERS, params=params, timeout=15)
+        LIMITER.acquire()
+        response = SESSION.get(NCBI_EUTILS_BASE_URL, params=params, timeout=(CONNECT_TIMEOUT, 15))
         response.raise_for_status()
-        content = response.text.strip()
+        content = response.content.strip()
 
-        if not content.startswith('>'):
+        if not content.startswith(b'>'):
             return ""
 
-        first_newline_index = content.find('\n')
+        first_newline_index = content.find(b'\n')
         
         if first_newline_index == -1:
             return ""
 
         sequence_body = content[first_newline_index + 1:].upper()
-        sequence = re.sub(r'[^A-Z*]', '', sequence_body)
+        sequence = NON_RESIDUE_BYTES.sub(b'', sequence_body).decode('ascii')
+        if sequence:
+            SEQ_CACHE[accession_id] = sequence
             
         return sequence
 
@@ -95,6 +244,99 @@ def fetch_protein_sequence(accession_id: str) -> str:
         return ""
 
 
+def post_accession_ids(accession_ids: List[str]) -> Tuple[str, str]:
+    """
+    Uploads accession IDs to the NCBI history server with EPost.
+    Returns the (WebEnv, query_key) pair that EFetch uses to page through them, or ('', '') on failure.
+    """
+    data = {
+        **NCBI_IDENTITY_PARAMS,
+        'db': 'protein',
+        'id': ','.join(accession_ids)
+    }
+    
+    try:
+        LIMITER.acquire()
+        response = SESSION.post(NCBI_EPOST_URL, data=data, timeout=(CONNECT_TIMEOUT, 30))
+        response.raise_for_status()
+        root = ElementTree.fromstring(response.content)
+        return root.findtext('WebEnv', ''), root.findtext('QueryKey', '')
+
+    except requests.exceptions.RequestException as e:
+        print(f"  ERROR: Could not post {len(accession_ids)} accession IDs using E-utilities: {e}")
+        return '', ''
+    except ElementTree.ParseError as e:
+        print(f"  ERROR: Unexpected EPost reply from E-utilities: {e}")
+        return '', ''
+
+
+def fetch_posted_sequences(web_env: str, query_key: str, retstart: int) -> Dict[str, str]:
+    """
+    Fetches one page of EFETCH_BATCH_SIZE posted sequences as multi-FASTA and returns them keyed by accession.
+    Both the versioned ('BAF62092.2') and unversioned ('BAF62092') accession are keys, since the
+    search page may list either form.
+    """
+    params = {
+        **NCBI_IDENTITY_PARAMS,
+        'db': 'protein',
+        'WebEnv': web_env,
+        'query_key': query_key,
+        'rettype': 'fasta',
+        'retmode': 'text',
+        'retstart': retstart,
+        'retmax': EFETCH_BATCH_SIZE
+    }
+    
+    try:
+        LIMITER.acquire()
+        response = SESSION.get(NCBI_EUTILS_BASE_URL, params=params, timeout=(CONNECT_TIMEOUT, 60))
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"  ERROR: Could not fetch sequence batch starting at {retstart} using E-utilities: {e}")
+        return {}
+
+    sequences = {}
+    # Every FASTA record starts with a '>' header line whose first word is the accession ID
+    # (parsed as bytes, so each sequence is cleaned with one bytes regex and decoded once)
+    for record in response.content.strip().lstrip(b'>').split(b'\n>'):
+        header, _, sequence_body = record.partition(b'\n')
+        if not header or not sequence_body:
+            continue
+        accession_id = header.split(maxsplit=1)[0].decode('ascii', 'replace')
+        sequence = NON_RESIDUE_BYTES.sub(b'', sequence_body.upper()).decode('ascii')
+        sequences[accession_id] = sequence
+        sequences.setdefault(accession_id.split('.')[0], sequence)
+    
+    # Empty bodies are not cached, so those records are fetched again on their own
+    SEQ_CACHE.update((record_id, sequence) for record_id, sequence in sequences.items() if sequence)
+    return sequences
+
+
+def extract_search_links(response: requests.Response) -> List[Tuple[str, str]]:
+    """
+    Returns the (href, text) pair of every result link on an NCBI search page.
+    A single regex pass over the raw bytes handles the usual plain-text links without building a DOM;
+    only if none of its links points at an accession (e.g. result titles wrapped in nested markup, so only
+    navigation links match) is the page parsed, with selectolax when installed or BeautifulSoup otherwise.
+    """
+    links = [
+        (html.unescape(href.decode('utf-8', 'replace')), html.unescape(text.decode('utf-8', 'replace')).strip())
+        for href, text in PROTEIN_LINK_PATTERN.findall(response.content)
+    ]
+    if any(ACCESSION_PATH_PATTERN.search(href) for href, _ in links):
+        return links
+
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(response.text)
+        return [
+            (node.attributes.get('href'), node.text(strip=True))
+            for node in tree.css(SEARCH_LINK_SELECTOR)
+        ]
+
+    soup = BeautifulSoup(response.content, HTML_PARSER, parse_only=SEARCH_LINK_STRAINER)
+    return [(link.get('href'), link.get_text(strip=True)) for link in soup.select(SEARCH_LINK_SELECTOR)]
+
+
 def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
     """
     Searches NCBI Protein database and extracts accession ID and name for each result.
@@ -104,19 +346,15 @@ def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
     
     print(f"  Searching NCBI for: '{query}'...")
     try:
-        response = requests.get(search_url, headers=HEADERS, timeout=15)
+        LIMITER.acquire()
+        response = SESSION.get(search_url, timeout=(CONNECT_TIMEOUT, 15))
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
         
         results = set()
-        title_links = soup.select('a.pr-link, a.title, a[href^="/protein/"], a[data-entity-id]')
 
-        for link in title_links:
-            href = link.get('href')
-            protein_name = link.get_text(strip=True)
-            
+        for href, protein_name in extract_search_links(response):
             if href and protein_name:
-                match = re.search(r'/protein/([A-Z]{1,3}\d+\.?\d*)', href)
+                match = ACCESSION_PATH_PATTERN.search(href)
                 
                 if match:
                     accession_id = match.group(1)
@@ -133,9 +371,12 @@ def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
         return []
 
 
-def main_scraper() -> Dict[str, Dict[str, Dict[str, List[Dict[str, str]]]]]:
+def main_scraper() -> Tuple[List[str], List[SeqRecord]]:
     """
     Executes the full scraping process with the new nested classification logic.
+    All family searches, and then all sequence fetches, run concurrently on a small thread pool,
+    since the time is spent waiting on NCBI rather than computing.
+    Returns the searched families and a flat list of classified SeqRecords.
     """
     print("--- Starting NCBI Fibroin Scraper ---")
     print("Step 1: Fetching Caddisfly family names...")
@@ -144,82 +385,92 @@ def main_scraper() -> Dict[str, Dict[str, Dict[str, List[Dict[str, str]]]]]:
     
     if not caddisfly_families:
         print("ERROR: Could not retrieve a list of Caddisfly families. Aborting.")
-        return {}
+        return [], []
 
     families_to_process = caddisfly_families
     
     print(f"Successfully retrieved {len(caddisfly_families)} families.")
     print("-" * 40)
     
-    final_results = {}
+    records = []
     
-    for family in families_to_process:
-        print(f"Step 2: Processing Family: {family}")
-        search_query = f"{family} {FIBROIN_TERM}"
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+        # Step 2a: Search every family at once
+        print(f"Step 2: Searching NCBI for {len(families_to_process)} families...")
+        search_queries = [f"{family} {FIBROIN_TERM}" for family in families_to_process]
+        family_records = dict(zip(families_to_process, executor.map(fetch_and_parse_search_results, search_queries)))
+
+        # Step 2b: Post every found accession once, then fetch the sequences in EFetch batches
+        all_records = [
+            (family, record_id, record_name)
+            for family, protein_records in family_records.items()
+            for record_id, record_name in protein_records
+        ]
+        unique_ids = list(dict.fromkeys(record_id for _, record_id, _ in all_records))
+        sequences = {record_id: SEQ_CACHE.get(record_id) for record_id in unique_ids}
+        sequences = {record_id: sequence for record_id, sequence in sequences.items() if sequence}
+        ids_to_fetch = [record_id for record_id in unique_ids if record_id not in sequences]
+        print(f"Found {len(all_records)} records in total. Fetching {len(ids_to_fetch)} sequences in batches...")
         
-        # Initialize storage with the new nested structure
-        final_results[family] = {
-            'full sequence': {k: [] for k in CHAIN_TYPES.keys()},
-            'partial sequence': {k: [] for k in CHAIN_TYPES.keys()}
-        }
+        web_env, query_key = post_accession_ids(ids_to_fetch) if ids_to_fetch else ('', '')
+        if web_env and query_key:
+            fetch_batch = partial(fetch_posted_sequences, web_env, query_key)
+            for batch in executor.map(fetch_batch, range(0, len(ids_to_fetch), EFETCH_BATCH_SIZE)):
+                sequences.update(batch)
+
+        # Anything the batches did not return is fetched on its own
+        missing_ids = [record_id for record_id in unique_ids if record_id not in sequences]
+        if missing_ids:
+            print(f"  Fetching {len(missing_ids)} remaining sequences individually...")
+            sequences.update(zip(missing_ids, executor.map(fetch_protein_sequence, missing_ids)))
+
+    for family, record_id, record_name in all_records:
+        sequence = sequences.get(record_id, '')
+        if not sequence:
+            continue
+
+        # 1. Determine sequence type (Full or Partial)
+        is_partial = 'partial' in record_name.lower()
+        seq_type = 'partial sequence' if is_partial else 'full sequence'
         
-        protein_records = fetch_and_parse_search_results(search_query)
+        # 2. Determine chain type (Heavy, Light, Other)
+        chain_type = classify_protein_chain(record_name)
         
+        records.append(SeqRecord(family, seq_type, chain_type, record_id, record_name, sequence))
+    
+    print("-" * 40)
+    type_counts = Counter((record.family, record.seq_type) for record in records)
+    for family, protein_records in family_records.items():
         if not protein_records:
             print(f"  No protein records found for {family}.")
-            print("-" * 40)
             continue
-            
-        print(f"  Found {len(protein_records)} records. Fetching sequences...")
-
-        for record_id, record_name in protein_records:
-            time.sleep(0.5) 
-            
-            sequence = fetch_protein_sequence(record_id)
-            
-            if not sequence:
-                continue
-
-            # 1. Determine sequence type (Full or Partial)
-            is_partial = 'partial' in record_name.lower()
-            seq_type = 'partial sequence' if is_partial else 'full sequence'
-            
-            # 2. Determine chain type (Heavy, Light, Other)
-            chain_type = classify_protein_chain(record_name)
-            
-            sequence_data = {
-                'id': record_id,
-                'name': record_name,
-                'sequence': sequence
-            }
-            
-            # Save data into the correct nested list
-            final_results[family][seq_type][chain_type].append(sequence_data)
-        
-        full_count = sum(len(v) for v in final_results[family]['full sequence'].values())
-        partial_count = sum(len(v) for v in final_results[family]['partial sequence'].values())
+        full_count = type_counts[(family, 'full sequence')]
+        partial_count = type_counts[(family, 'partial sequence')]
         
         print(f"  Finished {family}. Results: Full ({full_count}), Partial ({partial_count}).")
-        print("-" * 40)
+    print("-" * 40)
         
-    return final_results
+    return list(family_records), records
 
 # --- Output Generation Functions (NEW/Updated) ---
 
-def generate_sequence_markdown(data: Dict[str, str], chain_type: str, seq_type: str) -> str:
-    """Creates human-readable Markdown content for a single sequence file."""
+def generate_sequence_markdown(record: SeqRecord, wrapped: str = None) -> str:
+    """
+    Creates human-readable Markdown content for a single sequence file.
+    Pass the already wrapped FASTA lines as `wrapped` to avoid wrapping the sequence again.
+    """
     
-    sequence_lines = '\n'.join([data['sequence'][i:i+60] for i in range(0, len(data['sequence']), 60)])
+    sequence_lines = wrapped if wrapped is not None else wrap_fasta(record.sequence)
     
     return f"""# Fibroin Sequence Details
 
 | Key | Value |
 | :--- | :--- |
-| **Accession ID** | `{data['id']}` |
-| **Full Name** | `{data['name']}` |
-| **Sequence Type** | `{seq_type.title()}` |
-| **Chain Classification** | `{chain_type.title()}` |
-| **Length (Residues)** | `{len(data['sequence'])}` |
+| **Accession ID** | `{record.id}` |
+| **Full Name** | `{record.name}` |
+| **Sequence Type** | `{record.seq_type.title()}` |
+| **Chain Classification** | `{record.chain_type.title()}` |
+| **Length (Residues)** | `{len(record.sequence)}` |
 
 ---
 
@@ -228,65 +479,72 @@ def generate_sequence_markdown(data: Dict[str, str], chain_type: str, seq_type:
 The sequence below is displayed in FASTA format for easy reading and copy-pasting into alignment tools.
 
 ```fasta
->{data['id']} {data['name']}
+>{record.id} {record.name}
 {sequence_lines}
 ```
 """
 
 
-def generate_summary_index(results: Dict, root_dir: str):
+def generate_summary_index(families: List[str], records: List[SeqRecord], root_dir: str):
     """
     Generates a comprehensive Markdown index file summarizing all download statistics.
+    All counts come from one pass over the records; the file is written with a single call.
     """
     output_path = Path(root_dir) / "Summary_Index.md"
-    content = [
-        "# NCBI Caddisfly Fibroin Scraper Index",
-        "",
-        "This file summarizes the results from the NCBI protein database search for 'Fibroin' across all identified Caddisfly families.",
-        ""
-    ]
+    content = io.StringIO()
+    content.write(
+        "# NCBI Caddisfly Fibroin Scraper Index\n"
+        "\n"
+        "This file summarizes the results from the NCBI protein database search for 'Fibroin' across all identified Caddisfly families.\n"
+        "\n"
+    )
     
-    total_sequences = 0
+    category_counts = Counter((record.family, record.seq_type, record.chain_type) for record in records)
     
     # Start the detailed table
-    content.append("## Detailed Sequence Counts by Family and Type")
-    content.append("| Family Name | Total Found | Full Chain (Heavy) | Full Chain (Light) | Full Chain (Other) | Partial Chain (Heavy) | Partial Chain (Light) | Partial Chain (Other) |")
-    content.append("| :--- | :---: | :---: | :---: | :---: | :---: | :---: | :---: |")
+    content.write("## Detailed Sequence Counts by Family and Type\n")
+    content.write("| Family Name | Total Found | Full Chain (Heavy) | Full Chain (Light) | Full Chain (Other) | Partial Chain (Heavy) | Partial Chain (Light) | Partial Chain (Other) |\n")
+    content.write("| :--- | :---: | :---: | :---: | :---: | :---: | :---: | :---: |\n")
 
-    for family, seq_types in sorted(results.items()):
+    for family in sorted(families):
         
-        # Get counts for all six sub-categories
-        full_heavy = len(seq_types['full sequence']['heavy chain'])
-        full_light = len(seq_types['full sequence']['light chain'])
-        full_other = len(seq_types['full sequence']['others'])
-        
-        partial_heavy = len(seq_types['partial sequence']['heavy chain'])
-        partial_light = len(seq_types['partial sequence']['light chain'])
-        partial_other = len(seq_types['partial sequence']['others'])
-        
-        family_total = sum([full_heavy, full_light, full_other, partial_heavy, partial_light, partial_other])
-        total_sequences += family_total
+        # Get counts for all six sub-categories, in table column order
+        counts = [category_counts[(family, seq_type, chain_type)] for seq_type, chain_type in SUMMARY_COLUMN_KEYS]
+        family_total = sum(counts)
 
         # Append row to the table
-        row = f"| {family} | **{family_total}** | {full_heavy} | {full_light} | {full_other} | {partial_heavy} | {partial_light} | {partial_other} |"
-        content.append(row)
+        content.write(f"| {family} | **{family_total}** | {' | '.join(map(str, counts))} |\n")
 
-    content.append("")
-    content.append("---")
-    content.append(f"## GRAND TOTAL SEQUENCES DOWNLOADED: **{total_sequences}**")
-    content.append(f"\nAll sequences are saved in the `{root_dir}` folder, organized by family, sequence type, and chain type.")
+    content.write("\n")
+    content.write("---\n")
+    content.write(f"## GRAND TOTAL SEQUENCES DOWNLOADED: **{len(records)}**\n")
+    content.write(f"\nAll sequences are saved in the `{root_dir}` folder, organized by family, sequence type, and chain type.")
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(content))
+        output_path.write_text(content.getvalue(), encoding='utf-8')
         print(f"Successfully generated summary index: {output_path}")
     except Exception as e:
         print(f"ERROR: Could not write summary index file: {e}")
 
 
-def save_results_to_files(results: Dict[str, Dict[str, Dict[str, List[Dict[str, str]]]]]):
+def write_sequence_file(file_path: Path, content: str) -> bool:
+    """Writes one output file, returning False (and reporting the error) if it could not be saved."""
+    try:
+        # The whole file is one pre-encoded write, so skip the buffered layer and hand it straight to the OS
+        remaining = memoryview(content.encode('utf-8'))
+        with open(file_path, 'wb', buffering=0) as f:
+            while remaining:
+                remaining = remaining[f.write(remaining):] # Raw writes may be partial
+        return True
+    except Exception as e:
+        print(f"    ERROR: Could not write file {file_path.name}: {e}")
+        return False
+
+
+def save_results_to_files(families: List[str], records: List[SeqRecord]):
     """
     Creates the nested folder structure and saves all sequences into both FASTA and Markdown files.
+    The folders are created first; the many small files are then written concurrently.
     """
     print("\n" + "="*80)
     print(f"Step 3: Creating nested directories and saving sequences to: '{OUTPUT_ROOT_DIR}'")
@@ -296,62 +554,59 @@ def save_results_to_files(results: Dict[str, Dict[str, Dict[str, List[Dict[str,
     root_dir = Path(OUTPUT_ROOT_DIR)
     root_dir.mkdir(exist_ok=True)
     
-    total_files_saved = 0
-    
-    for family, seq_types in results.items():
+    # Pre-pass: one folder per family / sequence type / chain type, including empty ones
+    chain_dirs = {}
+    for family in families:
         family_dir = root_dir / safe_filename(family)
         family_dir.mkdir(exist_ok=True)
         print(f"Created family directory: {family_dir}")
 
-        for seq_type, chain_types in seq_types.items():
+        for seq_type in SEQUENCE_TYPES:
             # seq_type is 'full sequence' or 'partial sequence'
             type_dir = family_dir / safe_filename(seq_type)
             type_dir.mkdir(exist_ok=True)
             
-            for chain_type, sequences in chain_types.items():
+            for chain_type in CHAIN_TYPES:
                 # chain_type is 'heavy chain', 'light chain', or 'others'
                 chain_dir = type_dir / safe_filename(chain_type)
                 chain_dir.mkdir(exist_ok=True)
+                chain_dirs[(family, seq_type, chain_type)] = chain_dir
                 
                 print(f"  Created structure: {chain_dir}")
-                
-                if not sequences:
-                    # print(f"  No sequences in '{chain_type}' for '{seq_type}' in {family}.")
-                    continue
-                
-                for data in sequences:
-                    # 1. Prepare FASTA Content
-                    fasta_header = f">{data['id']} {data['name']}"
-                    # Sequence split into lines of 60 characters
-                    fasta_sequence = '\n'.join([data['sequence'][i:i+60] for i in range(0, len(data['sequence']), 60)])
-                    fasta_content = f"{fasta_header}\n{fasta_sequence}\n"
-                    
-                    # 2. Prepare Markdown Content (Word substitute)
-                    markdown_content = generate_sequence_markdown(data, chain_type, seq_type)
-                    
-                    # Generate a unique, safe filename using Accession ID
-                    final_filename_base = f"{data['id']}_{safe_filename(data['name'], 30)}"
-                    
-                    # Save FASTA file
-                    fasta_file_path = chain_dir / f"{final_filename_base}.fasta"
-                    try:
-                        with open(fasta_file_path, 'w', encoding='utf-8') as f:
-                            f.write(fasta_content)
-                        total_files_saved += 1
-                    except Exception as e:
-                        print(f"    ERROR: Could not write FASTA file {fasta_file_path.name}: {e}")
-
-                    # Save Markdown file
-                    markdown_file_path = chain_dir / f"{final_filename_base}.md"
-                    try:
-                        with open(markdown_file_path, 'w', encoding='utf-8') as f:
-                            f.write(markdown_content)
-                        total_files_saved += 1
-                    except Exception as e:
-                        print(f"    ERROR: Could not write Markdown file {markdown_file_path.name}: {e}")
+    
+    file_paths = []
+    file_contents = []
+    
+    def directory_key(record: SeqRecord) -> Tuple[str, str, str]:
+        return record.family, record.seq_type, record.chain_type
+
+    for key, directory_records in groupby(sorted(records, key=directory_key), key=directory_key):
+        chain_dir = chain_dirs[key]
+        
+        for record in directory_records:
+            # 1. Prepare FASTA Content
+            fasta_header = f">{record.id} {record.name}"
+            # Sequence split into lines of 60 characters (shared by the FASTA and Markdown files)
+            fasta_sequence = wrap_fasta(record.sequence)
+            fasta_content = f"{fasta_header}\n{fasta_sequence}\n"
+            
+            # 2. Prepare Markdown Content (Word substitute)
+            markdown_content = generate_sequence_markdown(record, wrapped=fasta_sequence)
+            
+            # Generate a unique, safe filename using Accession ID
+            final_filename_base = f"{record.id}_{safe_filename(record.name, 30)}"
+            
+            # Queue FASTA and Markdown files
+            file_paths.append(chain_dir / f"{final_filename_base}.fasta")
+            file_contents.append(fasta_content)
+            file_paths.append(chain_dir / f"{final_filename_base}.md")
+            file_contents.append(markdown_content)
+
+    with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as executor:
+        total_files_saved = sum(executor.map(write_sequence_file, file_paths, file_contents))
 
     # Generate the Index after saving all files
-    generate_summary_index(results, OUTPUT_ROOT_DIR)
+    generate_summary_index(families, records, OUTPUT_ROOT_DIR)
 
     print("\n" + "="*80)
     print(f"--- SUCCESS: Operation Complete. Total {total_files_saved} individual files saved (FASTA and MD). ---")
@@ -375,11 +630,11 @@ if __name__ == "__main__":
         exit()
 
     try:
-        # Run the scraper to get structured data
-        results = main_scraper()
+        # Run the scraper to get the classified records
+        families, records = main_scraper()
         
         # Save the results to the local file system
-        save_results_to_files(results)
+        save_results_to_files(families, records)
         
     except Exception as e:
         print(f"\nFATAL ERROR in main execution: {e}")
@@ -1,3 +1,15 @@
+MOLAR_MASS_LiBr = 86.845  # g/mol
+ML_TO_L = 1e-3  # L per mL
+
+
+def libr_mass(volume_ml: float, c_molL: float) -> float:
+    """
+    Required LiBr mass in g for `volume_ml` mL of H2O at `c_molL` mol/L.
+    Pure calculation (no input/print), so it can be called from other scripts.
+    """
+    return volume_ml * ML_TO_L * c_molL * MOLAR_MASS_LiBr
+
+
 def LiBr_con_mass_LiBr(volume_H2O,wanted_concetration):
       
     """
@@ -44,13 +56,12 @@ Calculate the required LiBr mass to achieve a desired LiBr concentration.
              print("Invalid choice. Please type 'Y' or 'N'.")
    
 
-    Molar_mass_of_LiBr = 86.845  # g/mol
-    volume_H2O = volume_H2O * 0.001  # Convert mL to L
-    mols_of_LiBr = volume_H2O * wanted_concetration
-    LiBr_mass =  mols_of_LiBr * Molar_mass_of_LiBr
+    LiBr_mass = libr_mass(volume_H2O, wanted_concetration)
      
     return  print("Required mass of LiBr (g):", LiBr_mass)
 
-volume =input("Enter the volume of H2O (mL): ")
-concentration = input("Enter the wanted concentration (mol/L): ")
-LiBr_con_mass_LiBr(volume, concentration)
+if __name__ == "__main__":
+    volume =input("Enter the volume of H2O (mL): ")
+    concentration = input("Enter the wanted concentration (mol/L): ")
+    LiBr_con_mass_LiBr(volume, concentration)
+
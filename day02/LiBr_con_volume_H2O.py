@@ -1,3 +1,15 @@
+MOLAR_MASS_LiBr = 86.845  # g/mol
+INV_LIBR_MOLAR = 1.0 / MOLAR_MASS_LiBr  # mol/g, precomputed so the calculation multiplies instead of divides
+
+
+def libr_volume(mass_g: float, c_molL: float) -> float:
+    """
+    Required H2O volume in mL for `mass_g` grams of LiBr at `c_molL` mol/L.
+    Pure calculation (no input/print), so it can be called from other scripts.
+    """
+    return mass_g * INV_LIBR_MOLAR / c_molL * 1000.0
+
+
 def LiBr_con_volume_H2O(LiBr_mass,wanted_concetration):
       
     """
@@ -34,7 +46,7 @@ Calculate the required H2O volume to achieve a desired LiBr concentration.
             new_concentration = input("Enter the wanted concentration (mol/L): ")
             
             try:
-                volume_H2O = float(new_mass)
+                LiBr_mass = float(new_mass)
                 wanted_concetration = float(new_concentration)
             except ValueError:
                 print("Invalid input, The new values must be numeric. Let's try again.")
@@ -46,13 +58,11 @@ Calculate the required H2O volume to achieve a desired LiBr concentration.
 
    
 
-    Molar_mass_of_LiBr = 86.845  # g/mol
-    mols_of_LiBr= LiBr_mass / Molar_mass_of_LiBr
-    volume_H2O = mols_of_LiBr / wanted_concetration
-    volume_H2O = volume_H2O * 1000  # Convert L to mL
+    volume_H2O = libr_volume(LiBr_mass, wanted_concetration)
    
     return  print("Required volume of H2O (mL):", volume_H2O)
 
-mass =input("Enter the mass of LiBr (g): ")
-concentration = input("Enter the wanted concentration (mol/L): ")
-LiBr_con_volume_H2O(mass, concentration)
\ No newline at end of file
+if __name__ == "__main__":
+    mass =input("Enter the mass of LiBr (g): ")
+    concentration = input("Enter the wanted concentration (mol/L): ")
+    LiBr_con_volume_H2O(mass, concentration)
@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from utils.constants import Molar_mass_of_LiBr, INV_LIBR_MOLAR, ML_TO_L
 
 class LiBrCalculator:
     def __init__(self, root):
@@ -62,13 +63,10 @@ class LiBrCalculator:
                 return
             
             if self.calc_type.get() == "volume":
-                mols_of_LiBr = value1 / 86.845
-                volume_H2O = (mols_of_LiBr / concentration) * 1000
+                volume_H2O = value1 * INV_LIBR_MOLAR / concentration * 1000.0
                 self.result_var.set(f"Required H₂O volume: {volume_H2O:.2f} mL")
             else:
-                volume_L = value1 * 0.001
-                mols_of_LiBr = volume_L * concentration
-                mass_LiBr = mols_of_LiBr * 86.845
+                mass_LiBr = value1 * ML_TO_L * concentration * Molar_mass_of_LiBr
                 self.result_var.set(f"Required LiBr mass: {mass_LiBr:.2f} g")
                 
         except ValueError:
@@ -1 +1,3 @@
-Molar_mass_of_LiBr = 86.845  # g/mol
\ No newline at end of file
+Molar_mass_of_LiBr = 86.845  # g/mol
+INV_LIBR_MOLAR = 1.0 / Molar_mass_of_LiBr  # mol/g, so the calculators multiply instead of divide
+ML_TO_L = 1e-3  # L per mL
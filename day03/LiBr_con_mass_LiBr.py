@@ -1,3 +1,25 @@
+def read_positive_float(prompt):
+    """
+    Prompts until the user enters a number greater than zero and returns it.
+    """
+    while True:
+        try:
+            value = float(input(prompt))
+        except ValueError:
+            print("Invalid input, the value must be numeric. Let's try again.")
+            continue
+        if value > 0:
+            return value
+        print("Invalid input, the value must be positive. Let's try again.")
+
+def read_volume_and_concentration():
+    """
+    Prompts for the H2O volume (mL) and the wanted concentration (mol/L).
+    """
+    volume_H2O = read_positive_float("Enter the volume of H2O (mL): ")
+    wanted_concetration = read_positive_float("Enter the wanted concentration (mol/L): ")
+    return volume_H2O, wanted_concetration
+
 def LiBr_con_mass_LiBr(volume_H2O,wanted_concetration):
       
     """
@@ -22,49 +44,35 @@ Calculate the required LiBr mass to achieve a desired LiBr concentration.
         print("Invalid input: Please enter numeric values for H2O volume and wanted concentration.")
         return # Exit the function on non-numeric input
     
+    if volume_H2O <= 0 or wanted_concetration <= 0:
+        print("Invalid input: Volume and concentration must be positive values (greater than zero).")
+        volume_H2O, wanted_concetration = read_volume_and_concentration()
+
     while True:
-        # --- NEW VALIDATION CHECK ---
-        if volume_H2O <= 0 or wanted_concetration <= 0:
-            print("Invalid input: Volume and concentration must be positive values (greater than zero).")
-            intuitive_input = 'n' # Force the user to re-enter
-        # --- END NEW VALIDATION CHECK ---
-        else:
-            print("Please confirm that the H2O volume is in mL and the wanted concentration is in mol/L.")
-            intuitive_input = input("Type 'Y' to confirm or 'N' to try again: ").strip().lower()
-        
+        print("Please confirm that the H2O volume is in mL and the wanted concentration is in mol/L.")
+        intuitive_input = input("Type 'Y' to confirm or 'N' to try again: ").strip().lower()
+
         if intuitive_input == 'y':
-            break 
-            
-        elif intuitive_input == 'n': 
+            break
+
+        elif intuitive_input == 'n':
             print("Please provide the correct inputs.")
-            
-            new_volume = input("Enter the volume of H2O (mL): ") 
-            new_concentration = input("Enter the wanted concentration (mol/L): ")
-            
-            try:
-                volume_H2O = float(new_volume)
-                wanted_concetration = float(new_concentration)
+            # The re-entered values are validated here and confirmed again on the next pass
+            volume_H2O, wanted_concetration = read_volume_and_concentration()
 
-                # Re-validate the new numeric inputs immediately
-                if volume_H2O <= 0 or wanted_concetration <= 0:
-                    print("Invalid input: The new values must be positive. Let's try again.")
-                    continue 
-                    
-            except ValueError:
-                print("Invalid input, The new values must be numeric. Let's try again.")
-                continue 
-        
         else:
-             print("Invalid choice. Please type 'Y' or 'N'.")
-   
+            print("Invalid choice. Please type 'Y' or 'N'.")
 
     Molar_mass_of_LiBr = 86.845  # g/mol
     volume_H2O = volume_H2O * 0.001  # Convert mL to L
     mols_of_LiBr = volume_H2O * wanted_concetration
     LiBr_mass =  mols_of_LiBr * Molar_mass_of_LiBr
      
-    return  print("Required mass of LiBr (g):", LiBr_mass)
+    return LiBr_mass
 
-volume =input("Enter the volume of H2O (mL): ")
-concentration = input("Enter the wanted concentration (mol/L): ")
-LiBr_con_mass_LiBr(volume, concentration)
+if __name__ == "__main__":
+    volume =input("Enter the volume of H2O (mL): ")
+    concentration = input("Enter the wanted concentration (mol/L): ")
+    result = LiBr_con_mass_LiBr(volume, concentration)
+    if result is not None:
+        print("Required mass of LiBr (g):", result)
@@ -67,8 +67,11 @@ Calculate the required H2O volume to achieve a desired LiBr concentration.
     volume_H2O = mols_of_LiBr / wanted_concetration
     volume_H2O = volume_H2O * 1000  # Convert L to mL
    
-    return  print("Required volume of H2O (mL):", volume_H2O)
+    return volume_H2O
 
-mass =input("Enter the mass of LiBr (g): ")
-concentration = input("Enter the wanted concentration (mol/L): ")
-LiBr_con_volume_H2O(mass, concentration)
\ No newline at end of file
+if __name__ == "__main__":
+    mass =input("Enter the mass of LiBr (g): ")
+    concentration = input("Enter the wanted concentration (mol/L): ")
+    result = LiBr_con_volume_H2O(mass, concentration)
+    if result is not None:
+        print("Required volume of H2O (mL):", result)
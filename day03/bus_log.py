@@ -6,6 +6,11 @@ Calculate the required LiBr mass to achieve a desired LiBr concentration.
     mols of LiBr = LiBr_mass / Molar mass of LiBr (86.845 g/mol)
 """
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed by the *_array batch functions
+    np = None
+
 MOLAR_MASS_LiBr = 86.845  # g/mol
 
 
@@ -59,4 +64,80 @@ def calculate_volume_H2O(LiBr_mass: float, wanted_concentration: float) -> float
     mols_of_LiBr = LiBr_mass / MOLAR_MASS_LiBr
     volume_H2O = mols_of_LiBr / wanted_concentration
     volume_H2O_mL = volume_H2O * 1000  # Convert L to mL
-    return volume_H2O_mL
\ No newline at end of file
+    return volume_H2O_mL
+
+
+# --- Optional Numba versions of the scalar functions ---
+# Compiled for float64 arguments only, so they are offered under their own names and the
+# functions above are never replaced; both are None when Numba is not installed.
+try:
+    from bus_log_numba import calculate_LiBr_mass as calculate_LiBr_mass_numba
+    from bus_log_numba import calculate_volume_H2O as calculate_volume_H2O_numba
+except ImportError:
+    calculate_LiBr_mass_numba = None
+    calculate_volume_H2O_numba = None
+
+
+# --- Batch (NumPy) versions for many inputs at once ---
+
+def _as_float64_arrays(*values):
+    """Converts the inputs to contiguous float64 arrays (raises ImportError if NumPy is missing)."""
+    if np is None:
+        raise ImportError("The *_array functions require NumPy: uv pip install numpy")
+    return [np.ascontiguousarray(value, dtype=np.float64) for value in values]
+
+
+def calculate_LiBr_mass_array(volume_H2O, wanted_concentration):
+    """
+    Vectorized calculate_LiBr_mass for arrays of volumes and concentrations (broadcast like NumPy).
+    
+    Args:
+        volume_H2O: Volumes of water in liters
+        wanted_concentration: Desired LiBr concentrations in mol/L
+    
+    Returns:
+        NumPy array of required LiBr masses in grams
+        
+    Raises:
+        ValueError: If any volume or concentration is zero or negative.
+    """
+    volume_H2O, wanted_concentration = _as_float64_arrays(volume_H2O, wanted_concentration)
+    
+    # --- INPUT VALIDATION: Must be strictly positive ---
+    if np.any(volume_H2O <= 0):
+        raise ValueError("Volume of water must be a positive number (greater than zero).")
+    if np.any(wanted_concentration <= 0):
+        raise ValueError("Concentration must be a positive number (greater than zero).")
+    # ----------------------------------------------------
+
+    LiBr_mass = np.multiply(volume_H2O, wanted_concentration)
+    LiBr_mass *= MOLAR_MASS_LiBr  # In place, so only one result array is allocated
+    return LiBr_mass
+
+
+def calculate_volume_H2O_array(LiBr_mass, wanted_concentration):
+    """
+    Vectorized calculate_volume_H2O for arrays of masses and concentrations (broadcast like NumPy).
+    
+    Args:
+        LiBr_mass: Masses of LiBr in grams
+        wanted_concentration: Desired LiBr concentrations in mol/L
+    
+    Returns:
+        NumPy array of required H2O volumes in milliliters
+        
+    Raises:
+        ValueError: If any mass or concentration is zero or negative.
+    """
+    LiBr_mass, wanted_concentration = _as_float64_arrays(LiBr_mass, wanted_concentration)
+    
+    # --- INPUT VALIDATION: Must be strictly positive ---
+    if np.any(LiBr_mass <= 0):
+        raise ValueError("LiBr mass must be a positive number (greater than zero).")
+    if np.any(wanted_concentration <= 0):
+        raise ValueError("Concentration must be a positive number (greater than zero).")
+    # ----------------------------------------------------
+    
+    volume_H2O_mL = np.divide(LiBr_mass, wanted_concentration)
+    volume_H2O_mL *= 1000 / MOLAR_MASS_LiBr  # mol -> L -> mL in one in-place multiply
+    return volume_H2O_mL
@@ -0,0 +1,37 @@
+"""
+Numba-compiled versions of the scalar LiBr calculations in bus_log.
+
+The explicit float64(float64, float64) signatures make Numba compile both functions
+when this module is imported (cached on disk), instead of on the first call.
+bus_log exposes them as calculate_LiBr_mass_numba and calculate_volume_H2O_numba.
+"""
+
+from numba import njit, float64
+
+MOLAR_MASS_LiBr = 86.845  # g/mol (same value as bus_log.MOLAR_MASS_LiBr)
+
+
+@njit(float64(float64, float64), cache=True)
+def calculate_LiBr_mass(volume_H2O, wanted_concentration):
+    """Compiled calculate_LiBr_mass: required LiBr mass (g) for a volume (L) and concentration (mol/L)."""
+    # --- INPUT VALIDATION: Must be strictly positive ---
+    if volume_H2O <= 0.0:
+        raise ValueError("Volume of water must be a positive number (greater than zero).")
+    if wanted_concentration <= 0.0:
+        raise ValueError("Concentration must be a positive number (greater than zero).")
+    # ----------------------------------------------------
+
+    return volume_H2O * wanted_concentration * MOLAR_MASS_LiBr
+
+
+@njit(float64(float64, float64), cache=True)
+def calculate_volume_H2O(LiBr_mass, wanted_concentration):
+    """Compiled calculate_volume_H2O: required H2O volume (mL) for a LiBr mass (g) and concentration (mol/L)."""
+    # --- INPUT VALIDATION: Must be strictly positive ---
+    if LiBr_mass <= 0.0:
+        raise ValueError("LiBr mass must be a positive number (greater than zero).")
+    if wanted_concentration <= 0.0:
+        raise ValueError("Concentration must be a positive number (greater than zero).")
+    # ----------------------------------------------------
+
+    return LiBr_mass / MOLAR_MASS_LiBr / wanted_concentration * 1000.0
@@ -1,43 +1,76 @@
 import os
 import shutil
-import glob
+from concurrent.futures import ThreadPoolExecutor
+
+# Folders and files to target for deletion (matched by name anywhere in the tree)
+DIR_TARGETS = {
+    '__pycache__',        # The notorious Python cache directory
+    '.pytest_cache',      # Pytest's internal cache directory
+    'htmlcov',            # Code coverage report directory
+    '.mypy_cache',        # MyPy type checker cache
+}
+FILE_TARGETS = {
+    '.coverage',          # Code coverage output file
+}
+FILE_SUFFIX = '.pyc'      # Bytecode files that may exist outside the cache
+
+# Deletions are I/O-bound, so a few threads per core overlap the syscalls
+MAX_DELETE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def find_project_artifacts():
+    """
+    Walks the tree once and returns a list of (path, is_dir) artifacts to delete.
+    """
+    artifacts = []
+    for root, dirs, files in os.walk('.', topdown=True):
+        for d in list(dirs):
+            if d in DIR_TARGETS:
+                artifacts.append((os.path.normpath(os.path.join(root, d)), True))
+                dirs.remove(d)  # Don't descend into a folder we are about to delete
+            elif d.startswith('.'):
+                dirs.remove(d)  # Like glob's '**', skip hidden folders such as .git or .venv
+
+        for f in files:
+            if f in FILE_TARGETS or f.endswith(FILE_SUFFIX):
+                artifacts.append((os.path.normpath(os.path.join(root, f)), False))
+    return artifacts
+
+def delete_artifact(artifact):
+    """
+    Deletes one artifact and returns the OSError if it failed, else None.
+    """
+    path, is_dir = artifact
+    try:
+        if is_dir:
+            # For directories, use shutil.rmtree for safe recursive deletion
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    except OSError as e:
+        # Handle cases where deletion fails (e.g., file is in use)
+        return e
+    return None
 
 def clean_project_artifacts():
     """
     Recursively finds and deletes common Python and testing artifacts 
     like __pycache__, .pyc files, and pytest cache folders.
     """
-    # List of files and folders to target for deletion
-    # '**/' means search recursively in all subdirectories
-    cleanup_patterns = [
-        '**/__pycache__',        # The notorious Python cache directory
-        '**/*.pyc',              # Bytecode files that may exist outside the cache
-        '**/.pytest_cache',      # Pytest's internal cache directory
-        '**/.coverage',          # Code coverage output file
-        '**/htmlcov',            # Code coverage report directory
-        '**/.mypy_cache',        # MyPy type checker cache
-    ]
-
     print("Starting project cleanup...")
     deleted_count = 0
 
-    for pattern in cleanup_patterns:
-        # Use glob.glob to find all matching paths recursively
-        for path in glob.glob(pattern, recursive=True):
-            try:
-                if os.path.isdir(path):
-                    # For directories, use shutil.rmtree for safe recursive deletion
-                    shutil.rmtree(path)
-                    print(f"🧹 Removed directory: {path}")
-                    deleted_count += 1
-                elif os.path.isfile(path):
-                    # For individual files
-                    os.remove(path)
-                    print(f"🗑️ Removed file: {path}")
-                    deleted_count += 1
-            except OSError as e:
-                # Handle cases where deletion fails (e.g., file is in use)
-                print(f"🚨 Error removing {path}: {e}")
+    artifacts = find_project_artifacts()
+    with ThreadPoolExecutor(max_workers=MAX_DELETE_WORKERS) as executor:
+        # map keeps the results in walk order; counting happens here in the main thread
+        for (path, is_dir), error in zip(artifacts, executor.map(delete_artifact, artifacts)):
+            if error:
+                print(f"🚨 Error removing {path}: {error}")
+            elif is_dir:
+                print(f"🧹 Removed directory: {path}")
+                deleted_count += 1
+            else:
+                print(f"🗑️ Removed file: {path}")
+                deleted_count += 1
 
     if deleted_count == 0:
         print("✅ Cleanup complete. No cache artifacts found.")
@@ -45,4 +78,4 @@ def clean_project_artifacts():
         print(f"\n✨ Cleanup finished. Total {deleted_count} artifacts removed.")
 
 if __name__ == "__main__":
-    clean_project_artifacts()
\ No newline at end of file
+    clean_project_artifacts()
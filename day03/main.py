@@ -1,30 +1,42 @@
-import subprocess
 import sys
+from bus_log import calculate_LiBr_mass, calculate_volume_H2O
 
 def main():
-    print("=" * 50)
-    print("LiBr Solution Calculator")
-    print("=" * 50)
-    print("\nChoose which calculation you want to perform:")
-    print("1. Calculate H2O Volume (given LiBr mass)")
-    print("2. Calculate LiBr Mass (given H2O volume)")
-    print("3. Exit")
-    print("-" * 50)
-    
-    choice = input("Enter your choice (1, 2, or 3): ").strip()
-    
-    if choice == '1':
-        print("\nRunning H2O Volume Calculator...\n")
-        subprocess.run([sys.executable, "LiBr_con_volume_H2O.py"])
-    elif choice == '2':
-        print("\nRunning LiBr Mass Calculator...\n")
-        subprocess.run([sys.executable, "LiBr_con_mass_LiBr.py"])
-    elif choice == '3':
-        print("Exiting the application. Goodbye!")
-        sys.exit()
-    else:
-        print("Invalid choice. Please enter 1, 2, or 3.")
-        main()  # Ask again
+    while True:
+        print("=" * 50)
+        print("LiBr Solution Calculator")
+        print("=" * 50)
+        print("\nChoose which calculation you want to perform:")
+        print("1. Calculate H2O Volume (given LiBr mass)")
+        print("2. Calculate LiBr Mass (given H2O volume)")
+        print("3. Exit")
+        print("-" * 50)
+
+        choice = input("Enter your choice (1, 2, or 3): ").strip()
+
+        if choice == '3':
+            print("Exiting the application. Goodbye!")
+            sys.exit()
+        elif choice not in ('1', '2'):
+            print("Invalid choice. Please enter 1, 2, or 3.")
+            continue  # Ask again
+
+        # The calculations run in this process (no new Python interpreter per choice)
+        try:
+            if choice == '1':
+                print("\nRunning H2O Volume Calculator...\n")
+                LiBr_mass = float(input("Enter the mass of LiBr (g): "))
+                concentration = float(input("Enter the wanted concentration (mol/L): "))
+                print("Required volume of H2O (mL):", calculate_volume_H2O(LiBr_mass, concentration))
+            else:
+                print("\nRunning LiBr Mass Calculator...\n")
+                volume_mL = float(input("Enter the volume of H2O (mL): "))
+                concentration = float(input("Enter the wanted concentration (mol/L): "))
+                print("Required mass of LiBr (g):", calculate_LiBr_mass(volume_mL / 1000, concentration))  # mL -> L
+            return
+        except ValueError as e:
+            # Non-numeric input, or a value that is zero or negative
+            print(f"Invalid input: {e} Let's try again.\n")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,3 +1,4 @@
+import re
 import pytest
 from bus_log import calculate_LiBr_mass, calculate_volume_H2O, MOLAR_MASS_LiBr
 
@@ -57,51 +58,111 @@ def test_calculate_volume_H2O_text_input(mass, concentration):
         calculate_volume_H2O(mass, concentration)
 
 # ----------------------------------------------------
-# --- 3. UPDATED: Zero Value Tests (Expecting ValueError) ---
+# --- 3./4. Zero and Negative Value Tests (Expecting ValueError) ---
 
-# Test Cases for calculate_LiBr_mass(volume_H2O, wanted_concentration)
-@pytest.mark.parametrize("volume, concentration", [
-    (0.0, 1.0),       # Zero volume
-    (0.5, 0.0),       # Zero concentration
-    (0.0, 0.0),       # Zero volume and concentration
-])
-def test_calculate_LiBr_mass_zero_values_raises_error(volume, concentration):
-    """Test mass calculation with zero values, expecting ValueError due to validation."""
+@pytest.mark.parametrize("function, args", [
+    # calculate_LiBr_mass(volume_H2O, wanted_concentration)
+    (calculate_LiBr_mass, (0.0, 1.0)),          # Zero volume
+    (calculate_LiBr_mass, (0.5, 0.0)),          # Zero concentration
+    (calculate_LiBr_mass, (0.0, 0.0)),          # Zero volume and concentration
+    (calculate_LiBr_mass, (-0.5, 1.0)),         # Negative volume
+    (calculate_LiBr_mass, (0.5, -1.0)),         # Negative concentration
+    (calculate_LiBr_mass, (-0.5, -1.0)),        # Both negative
+    # calculate_volume_H2O(LiBr_mass, wanted_concentration)
+    (calculate_volume_H2O, (0.0, 1.0)),         # Zero mass
+    (calculate_volume_H2O, (43.4225, 0.0)),     # Zero concentration
+    (calculate_volume_H2O, (0.0, 0.0)),         # Zero mass and concentration
+    (calculate_volume_H2O, (-43.4225, 1.0)),    # Negative mass
+    (calculate_volume_H2O, (43.4225, -1.0)),    # Negative concentration
+    (calculate_volume_H2O, (-43.4225, -1.0)),   # Both negative
+], ids=lambda value: value.__name__ if callable(value) else repr(value))
+def test_nonpositive_raises(function, args):
+    """Test both calculations with zero or negative inputs, expecting ValueError."""
     with pytest.raises(ValueError):
-        calculate_LiBr_mass(volume, concentration)
+        function(*args)
 
-# Test Cases for calculate_volume_H2O(LiBr_mass, wanted_concentration)
-@pytest.mark.parametrize("mass, concentration", [
-    (0.0, 1.0),       # Zero mass
-    (43.4225, 0.0),   # Zero concentration
-    (0.0, 0.0),       # Zero mass and concentration
+# ----------------------------------------------------
+# --- 5. Batch (NumPy) Versions ---
+
+def test_calculate_LiBr_mass_array_matches_scalar():
+    """Test that the array version gives the scalar result for every element."""
+    np = pytest.importorskip("numpy")
+    from bus_log import calculate_LiBr_mass_array
+    volumes = np.array([0.5, 1.0, 2.5])
+    concentrations = np.array([1.0, 9.3, 0.2])
+    expected = [calculate_LiBr_mass(v, c) for v, c in zip(volumes, concentrations)]
+    assert calculate_LiBr_mass_array(volumes, concentrations) == pytest.approx(expected)
+
+def test_calculate_volume_H2O_array_matches_scalar():
+    """Test that the array version gives the scalar result for every element."""
+    np = pytest.importorskip("numpy")
+    from bus_log import calculate_volume_H2O_array
+    masses = np.array([43.4225, 10.0, 807.6585])
+    expected = [calculate_volume_H2O(m, 9.3) for m in masses]
+    assert calculate_volume_H2O_array(masses, 9.3) == pytest.approx(expected)
+
+@pytest.mark.parametrize("values, concentrations", [
+    ([0.5, 0.0], 1.0),     # One zero value
+    ([0.5, 1.0], [1.0, -1.0]),  # One negative concentration
 ])
-def test_calculate_volume_H2O_zero_values_raises_error(mass, concentration):
-    """Test volume calculation with zero values, expecting ValueError due to validation."""
+def test_array_versions_nonpositive_raise_error(values, concentrations):
+    """Test that any zero or negative element raises ValueError in the array versions."""
+    pytest.importorskip("numpy")
+    from bus_log import calculate_LiBr_mass_array, calculate_volume_H2O_array
     with pytest.raises(ValueError):
-        calculate_volume_H2O(mass, concentration)
+        calculate_LiBr_mass_array(values, concentrations)
+    with pytest.raises(ValueError):
+        calculate_volume_H2O_array(values, concentrations)
 
 # ----------------------------------------------------
-# --- 4. UPDATED: Negative Value Tests (Expecting ValueError) ---
+# --- 6. Numba Versions ---
 
-# Test Cases for calculate_LiBr_mass(volume_H2O, wanted_concentration)
-@pytest.mark.parametrize("volume, concentration", [
-    (-0.5, 1.0),      # Negative volume
-    (0.5, -1.0),      # Negative concentration
-    (-0.5, -1.0)      # Both negative
+@pytest.fixture
+def numba_functions():
+    """The compiled (calculate_LiBr_mass_numba, calculate_volume_H2O_numba) pair from bus_log."""
+    pytest.importorskip("numba")
+    from bus_log import calculate_LiBr_mass_numba, calculate_volume_H2O_numba
+    return calculate_LiBr_mass_numba, calculate_volume_H2O_numba
+
+def test_scalar_functions_stay_pure_python():
+    """Test that importing Numba never replaces the documented pure-Python functions."""
+    assert calculate_LiBr_mass.__doc__ and calculate_volume_H2O.__doc__
+    assert calculate_LiBr_mass.__module__ == calculate_volume_H2O.__module__ == "bus_log"
+
+@pytest.mark.parametrize("first, concentration", [
+    (0.5, 1.0),
+    (43.4225, 9.3),
+    (1e-9, 1e6),
+    (807.6585, 0.2),
+    (2, 3),          # ints are converted to float64
 ])
-def test_calculate_LiBr_mass_negative_values_raises_error(volume, concentration):
-    """Test mass calculation with negative volume or concentration, expecting ValueError."""
-    with pytest.raises(ValueError):
-        calculate_LiBr_mass(volume, concentration)
+def test_numba_versions_match_pure_python(numba_functions, first, concentration):
+    """Test that the compiled functions give exactly the pure-Python results."""
+    LiBr_mass_numba, volume_H2O_numba = numba_functions
+    assert LiBr_mass_numba(first, concentration) == calculate_LiBr_mass(first, concentration)
+    assert volume_H2O_numba(first, concentration) == calculate_volume_H2O(first, concentration)
 
-# Test Cases for calculate_volume_H2O(LiBr_mass, wanted_concentration)
-@pytest.mark.parametrize("mass, concentration", [
-    (-43.4225, 1.0),      # Negative mass
-    (43.4225, -1.0),      # Negative concentration
-    (-43.4225, -1.0)       # Both negative
+@pytest.mark.parametrize("first, concentration", [
+    (0.0, 1.0),
+    (0.5, 0.0),
+    (-0.5, 1.0),
+    (0.5, -1.0),
+    (0, 1),
 ])
-def test_calculate_volume_H2O_negative_values_raises_error(mass, concentration):
-    """Test volume calculation with negative mass or concentration, expecting ValueError."""
-    with pytest.raises(ValueError):
-        calculate_volume_H2O(mass, concentration)
\ No newline at end of file
+def test_numba_versions_raise_same_errors(numba_functions, first, concentration):
+    """Test that the compiled functions raise the same ValueError message as the pure-Python ones."""
+    for numba_function, function in zip(numba_functions, (calculate_LiBr_mass, calculate_volume_H2O)):
+        with pytest.raises(ValueError) as expected:
+            function(first, concentration)
+        with pytest.raises(ValueError, match=re.escape(str(expected.value))):
+            numba_function(first, concentration)
+
+@pytest.mark.parametrize("first, concentration", [
+    ("text", 1.0),
+    (0.5, "text"),
+])
+def test_numba_versions_reject_text(numba_functions, first, concentration):
+    """Test that text input is rejected with TypeError, as in the pure-Python versions."""
+    for numba_function in numba_functions:
+        with pytest.raises(TypeError):
+            numba_function(first, concentration)
@@ -140,11 +140,22 @@ def parse_trichoptera_data(raw_text: str) -> Dict[str, Dict[str, List[str]]]:
 
 # --- NEW EXPORT FUNCTION (Used by the NCBI logic file) ---
 
+# Extant taxonomy from the first successful fetch; stays empty after a failure so the next call retries
+_EXTANT_TAXONOMY: Dict[str, Dict[str, List[str]]] = {}
+
 def get_trichoptera_taxonomy_structure() -> Dict[str, Dict[str, List[str]]]:
     """
     Public function to fetch and return the structured taxonomy data,
     excluding fossil suborders, superfamilies, and families ('†' marker).
+    Only a successful fetch is kept for the process; each caller gets its own copy.
     """
+    if not _EXTANT_TAXONOMY:
+        _EXTANT_TAXONOMY.update(_fetch_extant_taxonomy())
+    return {suborder: {superfamily: list(families) for superfamily, families in superfamilies.items()}
+            for suborder, superfamilies in _EXTANT_TAXONOMY.items()}
+
+def _fetch_extant_taxonomy() -> Dict[str, Dict[str, List[str]]]:
+    """Downloads and parses the taxonomy, dropping fossil entries. Returns {} if the fetch fails."""
     raw_content = fetch_taxonomy_data(WIKI_URL)
     if not raw_content:
         # print("WARNING: Scraper failed to fetch new data.")
@@ -187,14 +198,14 @@ def get_caddisfly_family_names() -> List[str]:
         # Fallback list if fetching fails
         return []
 
-    # Extract only extant families (already filtered by get_trichoptera_taxonomy_structure)
-    extant_families = []
-    for suborders in structured_data.values():
-        for families in suborders.values():
-            extant_families.extend(families) # No need to filter '†' again
-            
-    # Return unique extant names
-    return sorted(list(set(extant_families)))
+    # Unique extant names (already filtered by get_trichoptera_taxonomy_structure), collected straight into a set
+    extant_families = {
+        family
+        for suborders in structured_data.values()
+        for families in suborders.values()
+        for family in families
+    }
+    return sorted(extant_families)
 
 # A simple block to test the module if run directly
 if __name__ == "__main__":
@@ -1,18 +1,42 @@
 import requests
-from bs4 import BeautifulSoup
 from typing import List, Dict, Tuple, Any
 import re
+import io
+import os
+import sys
 import time
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from caddisfly_scraper import get_trichoptera_taxonomy_structure
 
+# The NCBI helpers shared with ../ncbi_fibroin_scraper.py live one directory up
+DAY04_ROOT = Path(__file__).resolve().parent.parent
+if str(DAY04_ROOT) not in sys.path:
+    sys.path.insert(0, str(DAY04_ROOT))
+from ncbi_shared import RateLimiter, create_session
+
 # --- Configuration & Constants ---
-NCBI_BASE_URL = "https://www.ncbi.nlm.nih.gov/protein/"
 NCBI_EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+NCBI_ESEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+NCBI_ESUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
 FIBROIN_TERM = "fibroin"
-SLEEP_TIME = 0.5 # Pause between API calls to be polite
+
+# Optional NCBI API key (and contact e-mail): with a key E-utilities allow 10 requests/second instead of 3
+NCBI_API_KEY = os.environ.get('NCBI_API_KEY')
+NCBI_EMAIL = os.environ.get('NCBI_EMAIL')
+NCBI_IDENTITY_PARAMS = {'tool': 'fibroin_scraper'} # Sent with every E-utilities call
+if NCBI_API_KEY:
+    NCBI_IDENTITY_PARAMS['api_key'] = NCBI_API_KEY
+if NCBI_EMAIL:
+    NCBI_IDENTITY_PARAMS['email'] = NCBI_EMAIL
+
+REQUESTS_PER_SECOND = 10 if NCBI_API_KEY else 3 # NCBI's rate limit, shared by all workers
+MAX_FETCH_WORKERS = REQUESTS_PER_SECOND # Concurrent sequence downloads
+MAX_FAMILY_WORKERS = 4 # Families searched and downloaded at the same time
+ESEARCH_RETMAX = 500 # Most search hits kept per family
+SEQ_CACHE_DIR = Path(".ncbi_cache") # Downloaded sequences, one file per accession
+SEQ_CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600 # Older sequence files are deleted and downloaded again
 
 # Classification mapping for protein chains
 CHAIN_TYPES = {
@@ -20,6 +44,23 @@ CHAIN_TYPES = {
     'light chain': ['light chain', 'fib-l', 'l-fibroin', 'l chain'],
     'others': [] # Default if no match is found
 }
+# (chain_type, keywords) pairs in CHAIN_TYPES order, without the keyword-less 'others'
+CHAIN_KEYWORDS = tuple(
+    (chain_type, tuple(keywords))
+    for chain_type, keywords in CHAIN_TYPES.items()
+    if keywords
+)
+
+# Every byte that is not an (upper-case) residue letter or stop '*', deleted from FASTA lines with bytes.translate
+NON_RESIDUE_BYTES = bytes(b for b in range(256) if not (ord('A') <= b <= ord('Z') or b == ord('*')))
+
+# --- Compiled Patterns ---
+ORGANISM_PATTERN = re.compile(r'\[(.*?)\]$') # Content inside the last pair of square brackets
+
+
+# --- Request Pacing & HTTP Session (see ncbi_shared.py) ---
+LIMITER = RateLimiter(REQUESTS_PER_SECOND)
+SESSION = create_session(pool_connections=20, pool_maxsize=20)
 
 
 # --- Utility Functions (Part of the logic to classify data) ---
@@ -29,20 +70,16 @@ def classify_protein_chain(name: str) -> str:
     Classifies a protein based on its name into 'heavy chain', 'light chain', or 'others'.
     """
     name_lower = name.lower()
-    for chain_type, keywords in CHAIN_TYPES.items():
-        if chain_type == 'others':
-            continue
-        for keyword in keywords:
-            if keyword in name_lower:
-                return chain_type
+    for chain_type, keywords in CHAIN_KEYWORDS:
+        if any(keyword in name_lower for keyword in keywords):
+            return chain_type
     return 'others'
 
 def extract_organism_name(protein_name: str) -> str:
     """
     Extracts the organism name typically enclosed in square brackets in the NCBI title.
     """
-    # Regex to find content inside the last pair of square brackets
-    match = re.search(r'\[(.*?)\]$', protein_name.strip())
+    match = ORGANISM_PATTERN.search(protein_name.strip())
     if match:
         organism = match.group(1).strip()
         if len(organism) > 3:
@@ -57,6 +94,7 @@ def fetch_protein_sequence(accession_id: str) -> str:
     Fetches the protein sequence using NCBI E-utilities (Efetch) for reliable FASTA output.
     """
     params = {
+        **NCBI_IDENTITY_PARAMS,
         'db': 'protein',
         'id': accession_id,
         'rettype': 'fasta',
@@ -64,23 +102,25 @@ def fetch_protein_sequence(accession_id: str) -> str:
     }
     
     try:
-        response = requests.get(NCBI_EUTILS_BASE_URL, headers=HEADERS, params=params, timeout=15)
-        response.raise_for_status()
-        content = response.text.strip()
-
-        if not content.startswith('>'):
-            return ""
-
-        first_newline_index = content.find('\n')
-        
-        if first_newline_index == -1:
-            return ""
+        LIMITER.acquire()
+        # Streamed line by line, so a long heavy chain is never held as one big text plus its copies
+        with SESSION.get(NCBI_EUTILS_BASE_URL, params=params, timeout=15, stream=True) as response:
+            response.raise_for_status()
+            sequence_buffer = io.StringIO()
+            header_seen = False
 
-        sequence_body = content[first_newline_index + 1:].upper()
-        # Remove any non-standard amino acid characters 
-        sequence = re.sub(r'[^A-Z*]', '', sequence_body) 
+            for line in response.iter_lines():
+                if not header_seen:
+                    if not line.strip():
+                        continue
+                    if not line.lstrip().startswith(b'>'):
+                        return ""
+                    header_seen = True
+                    continue
+                # Remove any non-standard amino acid characters in one C-level pass
+                sequence_buffer.write(line.upper().translate(None, NON_RESIDUE_BYTES).decode('ascii'))
             
-        return sequence
+        return sequence_buffer.getvalue()
 
     except requests.exceptions.RequestException as e:
         print(f"      ERROR: Could not fetch sequence for {accession_id} using E-utilities: {e}")
@@ -90,40 +130,130 @@ def fetch_protein_sequence(accession_id: str) -> str:
         return ""
 
 
+def fetch_protein_sequences(accession_ids: List[str]) -> Dict[str, str]:
+    """
+    Fetches many protein sequences with a single Efetch call and returns them keyed by accession ID.
+    Both the versioned ('BAF62092.2') and unversioned ('BAF62092') accession are keys, since the
+    search page may list either form. Returns an empty dict on failure.
+    """
+    data = {
+        **NCBI_IDENTITY_PARAMS,
+        'db': 'protein',
+        'id': ','.join(accession_ids),
+        'rettype': 'fasta',
+        'retmode': 'text'
+    }
+    
+    try:
+        # POST so a long ID list does not overflow the URL
+        LIMITER.acquire()
+        response = SESSION.post(NCBI_EUTILS_BASE_URL, data=data, timeout=60)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"      ERROR: Could not fetch {len(accession_ids)} sequences using E-utilities: {e}")
+        return {}
+
+    sequences = {}
+    # Every FASTA record starts with a '>' header line whose first word is the accession ID
+    # (parsed as bytes, so each sequence is cleaned with bytes.translate and decoded once)
+    for record in response.content.strip().lstrip(b'>').split(b'\n>'):
+        header, _, sequence_body = record.partition(b'\n')
+        if not header or not sequence_body:
+            continue
+        accession_id = header.split(maxsplit=1)[0].decode('ascii', 'replace')
+        sequence = sequence_body.upper().translate(None, NON_RESIDUE_BYTES).decode('ascii')
+        sequences[accession_id] = sequence
+        sequences.setdefault(accession_id.split('.')[0], sequence)
+    return sequences
+
+
+def read_cached_sequences(accession_ids: List[str]) -> Dict[str, str]:
+    """
+    Returns the sequences already saved in SEQ_CACHE_DIR by an earlier run, keyed by accession ID.
+    Files older than SEQ_CACHE_MAX_AGE_SECONDS are removed instead, so they are downloaded again.
+    """
+    cached = {}
+    oldest_allowed = time.time() - SEQ_CACHE_MAX_AGE_SECONDS
+    for accession_id in accession_ids:
+        cache_file = SEQ_CACHE_DIR / f"{accession_id}.seq"
+        try:
+            if cache_file.stat().st_mtime < oldest_allowed:
+                cache_file.unlink()
+                continue
+            cached[accession_id] = cache_file.read_text(encoding='ascii')
+        except OSError:
+            continue # Not cached yet (or removed by another worker)
+    return cached
+
+
+def cache_sequences(sequences: Dict[str, str]):
+    """
+    Saves downloaded sequences to SEQ_CACHE_DIR so later runs can skip the download.
+    Each file is written to a temporary name and renamed, so an interrupted run never leaves a partial file.
+    """
+    try:
+        SEQ_CACHE_DIR.mkdir(exist_ok=True)
+        for accession_id, sequence in sequences.items():
+            if not sequence:
+                continue # Failed downloads are retried next run
+            cache_file = SEQ_CACHE_DIR / f"{accession_id}.seq"
+            temp_file = cache_file.with_suffix(f'.{threading.get_ident()}.tmp') # Families may share an accession
+            temp_file.write_text(sequence, encoding='ascii')
+            os.replace(temp_file, cache_file)
+    except OSError as e:
+        print(f"      WARNING: Could not update the sequence cache: {e}")
+
+
 def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
     """
     Searches NCBI Protein database and extracts accession ID and name for each result.
+    Uses the E-utilities JSON API (ESearch, then ESummary) instead of scraping the search page.
     """
-    search_url = f"{NCBI_BASE_URL}?term={query}"
+    search_params = {
+        **NCBI_IDENTITY_PARAMS,
+        'db': 'protein',
+        'term': query,
+        'retmode': 'json',
+        'retmax': ESEARCH_RETMAX,
+        'usehistory': 'y'
+    }
     
-    # print(f"    Searching NCBI for: '{query}'...")
+    # print(f"    Searching NCBI for: '{query}'...")
     try:
-        response = requests.get(search_url, headers=HEADERS, timeout=15)
+        # 1. ESearch: the matching records are kept on NCBI's history server
+        LIMITER.acquire()
+        response = SESSION.get(NCBI_ESEARCH_URL, params=search_params, timeout=15)
         response.raise_for_status()
+        search_result = response.json()['esearchresult']
         
-        # Explicitly check for NCBI's "Term not found" message
-        if "The following term was not found in Protein:" in response.text:
+        if int(search_result.get('count', 0)) == 0:
             return []
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # 2. ESummary: accession and title of every hit, read back from the history server
+        summary_params = {
+            **NCBI_IDENTITY_PARAMS,
+            'db': 'protein',
+            'WebEnv': search_result['webenv'],
+            'query_key': search_result['querykey'],
+            'retmode': 'json',
+            'retmax': ESEARCH_RETMAX
+        }
+        LIMITER.acquire()
+        response = SESSION.get(NCBI_ESUMMARY_URL, params=summary_params, timeout=15)
+        response.raise_for_status()
+        summaries = response.json()['result']
         
-        results = set()
-        title_links = soup.select('a.pr-link, a.title, a[href^="/protein/"], a[data-entity-id]')
-
-        for link in title_links:
-            href = link.get('href')
-            protein_name = link.get_text(strip=True)
-            
-            if href and protein_name:
-                # Regex to extract accession ID (e.g., AAN02787.1)
-                match = re.search(r'/protein/([A-Z]{1,3}\d+\.?\d*)', href)
-                
-                if match:
-                    accession_id = match.group(1)
-                    if accession_id not in protein_name:
-                        results.add((accession_id, protein_name))
+        # Each accession is kept once, so its sequence is never fetched or saved twice
+        results = []
+        seen_ids = set()
+        for uid in summaries.get('uids', []):
+            accession_id = summaries[uid].get('accessionversion')
+            protein_name = summaries[uid].get('title')
+            if accession_id and protein_name and accession_id not in seen_ids:
+                seen_ids.add(accession_id)
+                results.append((accession_id, protein_name))
         
-        return list(results)
+        return results
 
     except requests.exceptions.RequestException as e:
         print(f"    ERROR: Could not fetch search results for '{query}': {e}")
@@ -133,6 +263,35 @@ def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
         return []
 
 
+def fetch_family_sequences(family: str) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Runs one family's pipeline: NCBI search, then its sequences from the disk cache, one batch
+    Efetch call, and single-record fetches for anything the batch missed.
+    Returns the (accession ID, name) records and their sequences ('' where a fetch failed), in the same order.
+    """
+    protein_records = fetch_and_parse_search_results(f"{family} {FIBROIN_TERM}")
+    if not protein_records:
+        return [], []
+
+    # Sequences saved by an earlier run are read from disk instead of downloaded again
+    record_ids = [record_id for record_id, _ in protein_records]
+    cached_sequences = read_cached_sequences(record_ids)
+    ids_to_fetch = [record_id for record_id in record_ids if record_id not in cached_sequences]
+
+    # One Efetch call for the rest of the family
+    batch_sequences = fetch_protein_sequences(ids_to_fetch) if ids_to_fetch else {}
+
+    # Anything the batch did not return is fetched one by one, concurrently
+    missing_ids = [record_id for record_id in ids_to_fetch if record_id not in batch_sequences]
+    if missing_ids:
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            batch_sequences.update(zip(missing_ids, executor.map(fetch_protein_sequence, missing_ids)))
+
+    cache_sequences({record_id: batch_sequences[record_id] for record_id in ids_to_fetch})
+    batch_sequences.update(cached_sequences)
+    return protein_records, [batch_sequences[record_id] for record_id in record_ids]
+
+
 def run_ncbi_search_and_classification() -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
     Orchestrates the taxonomy fetch, NCBI search, sequence fetch, and classification.
@@ -169,71 +328,66 @@ def run_ncbi_search_and_classification() -> Tuple[Dict[str, Any], Dict[str, Any]
                 family_to_path[family] = {'suborder': suborder, 'superfamily': superfamily}
                 
     
-    for family in families_to_process:
-        print(f"Step 2: Processing Family: {family}")
-        search_query = f"{family} {FIBROIN_TERM}"
+    # Every family's search and download runs as its own pipeline on a thread pool, so several
+    # families are in flight at once; results are still classified in family order.
+    # LIMITER keeps all of them together within NCBI's rate limit
+    with ThreadPoolExecutor(max_workers=MAX_FAMILY_WORKERS) as family_executor:
+        family_downloads = family_executor.map(fetch_family_sequences, families_to_process)
         
-        # Initialize storage for the current family, keyed by organism name
-        final_results[family] = {}
+        for family, (protein_records, sequences) in zip(families_to_process, family_downloads):
+            print(f"Step 2: Processing Family: {family}")
         
-        protein_records = fetch_and_parse_search_results(search_query)
+            # Initialize storage for the current family, keyed by organism name
+            final_results[family] = {}
         
-        if not protein_records:
-            print(f"    No protein records found for {family}. Skipping download.")
-            print("-" * 40)
-            continue
+            if not protein_records:
+                print(f"    No protein records found for {family}. Skipping download.")
+                print("-" * 40)
+                continue
             
-        print(f"    Found {len(protein_records)} records. Fetching sequences...")
+            print(f"    Found {len(protein_records)} records. Fetching sequences...")
 
-        for record_id, record_name in protein_records:
-            time.sleep(SLEEP_TIME) 
-            
-            sequence = fetch_protein_sequence(record_id)
-            
-            if not sequence:
-                continue
+            # Running counts for the status line, updated as each sequence is stored
+            full_count = 0
+            partial_count = 0
+
+            for (record_id, record_name), sequence in zip(protein_records, sequences):
+                if not sequence:
+                    continue
 
-            # 0. Extract Organism Name
-            organism_name = extract_organism_name(record_name)
+                # 0. Extract Organism Name
+                organism_name = extract_organism_name(record_name)
             
-            # Initialize organism storage if new
-            if organism_name not in final_results[family]:
-                final_results[family][organism_name] = {
-                    'full sequence': {k: [] for k in CHAIN_TYPES.keys()},
-                    'partial sequence': {k: [] for k in CHAIN_TYPES.keys()}
-                }
+                # Initialize organism storage if new
+                if organism_name not in final_results[family]:
+                    final_results[family][organism_name] = {
+                        'full sequence': {k: [] for k in CHAIN_TYPES.keys()},
+                        'partial sequence': {k: [] for k in CHAIN_TYPES.keys()}
+                    }
 
-            # 1. Determine sequence type (Full or Partial)
-            is_partial = 'partial' in record_name.lower()
-            seq_type = 'partial sequence' if is_partial or '*' in sequence else 'full sequence'
+                # 1. Determine sequence type (Full or Partial)
+                is_partial = 'partial' in record_name.lower()
+                seq_type = 'partial sequence' if is_partial or '*' in sequence else 'full sequence'
             
-            # 2. Determine chain type (Heavy, Light, Other)
-            chain_type = classify_protein_chain(record_name)
+                # 2. Determine chain type (Heavy, Light, Other)
+                chain_type = classify_protein_chain(record_name)
             
-            sequence_data = {
-                'id': record_id,
-                'name': record_name,
-                'organism': organism_name,
-                'sequence': sequence
-            }
+                sequence_data = {
+                    'id': record_id,
+                    'name': record_name,
+                    'organism': organism_name,
+                    'sequence': sequence
+                }
             
-            # Save data into the correct nested list: family -> organism -> seq_type -> chain_type
-            final_results[family][organism_name][seq_type][chain_type].append(sequence_data)
+                # Save data into the correct nested list: family -> organism -> seq_type -> chain_type
+                final_results[family][organism_name][seq_type][chain_type].append(sequence_data)
+                if seq_type == 'full sequence':
+                    full_count += 1
+                else:
+                    partial_count += 1
         
-        # Calculate counts for printing status
-        full_count = sum(
-            len(v) 
-            for org_data in final_results[family].values() 
-            for v in org_data['full sequence'].values()
-        )
-        partial_count = sum(
-            len(v) 
-            for org_data in final_results[family].values() 
-            for v in org_data['partial sequence'].values()
-        )
-        
-        print(f"    Finished {family}. Results: Total found ({full_count + partial_count}), Full ({full_count}), Partial ({partial_count}).")
-        print("-" * 40)
+            print(f"    Finished {family}. Results: Total found ({full_count + partial_count}), Full ({full_count}), Partial ({partial_count}).")
+            print("-" * 40)
             
     # Return the classified data and the taxonomy path map
     return final_results, family_to_path
\ No newline at end of file
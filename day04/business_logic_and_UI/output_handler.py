@@ -1,15 +1,28 @@
 import re
+import sys
 from typing import Dict, Any
 from pathlib import Path
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+
+# The NCBI helpers shared with ../ncbi_fibroin_scraper.py live one directory up
+DAY04_ROOT = Path(__file__).resolve().parent.parent
+if str(DAY04_ROOT) not in sys.path:
+    sys.path.insert(0, str(DAY04_ROOT))
+from ncbi_shared import SUMMARY_COLUMN_KEYS, wrap_fasta
 
 # --- Configuration ---
 OUTPUT_ROOT_DIR = "ncbi_fibroin_sequences" # Root folder for all output
+MAX_WRITE_WORKERS = 16 # Concurrent file writes when saving results
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|]') # Characters not allowed in file names
 
 # --- Utility Functions (Related to saving files) ---
 
+@lru_cache(maxsize=4096)
 def safe_filename(name: str, max_len=50) -> str:
-    """Generates a safe filename/directory name from a string."""
-    safe_name = re.sub(r'[\\/:*?"<>|]', '', name).strip()
+    """Generates a safe filename/directory name from a string (cached: the same few names repeat a lot)."""
+    safe_name = UNSAFE_FILENAME_CHARS.sub('', name).strip()
     # Normalize spaces and hyphens to underscores, remove dots
     safe_name = safe_name.replace(' ', '_').replace('-', '_').replace('.', '_').lower()
     return safe_name[:max_len]
@@ -17,21 +30,17 @@ def safe_filename(name: str, max_len=50) -> str:
 
 # --- Content Generation Functions ---
 
-def generate_sequence_markdown(data: Dict[str, str], chain_type: str, seq_type: str) -> str:
-    """Creates human-readable Markdown content for a single sequence file."""
-    
-    sequence_lines = '\n'.join([data['sequence'][i:i+60] for i in range(0, len(data['sequence']), 60)])
-    
-    return f"""# Fibroin Sequence Details
+# Page layout for one sequence's Markdown file, filled in by generate_sequence_markdown
+SEQUENCE_MARKDOWN_TEMPLATE = """# Fibroin Sequence Details
 
 | Key | Value |
 | :--- | :--- |
-| **Accession ID** | `{data['id']}` |
-| **Full Name** | `{data['name']}` |
-| **Organism Name** | `{data['organism']}` |
-| **Sequence Type** | `{seq_type.title()}` |
-| **Chain Classification** | `{chain_type.title()}` |
-| **Length (Residues)** | `{len(data['sequence'])}` |
+| **Accession ID** | `{id}` |
+| **Full Name** | `{name}` |
+| **Organism Name** | `{organism}` |
+| **Sequence Type** | `{seq_type}` |
+| **Chain Classification** | `{chain_type}` |
+| **Length (Residues)** | `{length}` |
 
 ---
 
@@ -40,15 +49,49 @@ def generate_sequence_markdown(data: Dict[str, str], chain_type: str, seq_type:
 The sequence below is displayed in standard FASTA format for easy reading and copy-pasting into alignment tools.
 
 ```fasta
->{data['id']} {data['name']}
+>{id} {name}
 {sequence_lines}
 ```
 """
 
 
+def generate_sequence_markdown(data: Dict[str, str], chain_type: str, seq_type: str, wrapped: str = None) -> str:
+    """
+    Creates human-readable Markdown content for a single sequence file.
+    Pass the already wrapped FASTA lines as `wrapped` to avoid wrapping the sequence again.
+    """
+    
+    sequence_lines = wrapped if wrapped is not None else wrap_fasta(data['sequence'])
+    
+    return SEQUENCE_MARKDOWN_TEMPLATE.format_map({
+        'id': data['id'],
+        'name': data['name'],
+        'organism': data['organism'],
+        'seq_type': seq_type.title(),
+        'chain_type': chain_type.title(),
+        'length': len(data['sequence']),
+        'sequence_lines': sequence_lines
+    })
+
+
+def write_output_file(job) -> str:
+    """
+    Writes one (path, UTF-8 bytes, kind) job and returns an error message, or '' on success.
+    Bytes are written as-is: no text-mode encoding or newline translation per file.
+    """
+    file_path, content, kind = job
+    try:
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        return ''
+    except Exception as e:
+        return f"      ERROR: Could not write {kind} file {file_path.name}: {e}"
+
+
 def generate_summary_index(results: Dict[str, Any], root_dir: str):
     """
     Generates a comprehensive Markdown index file summarizing all download statistics.
+    All counts are gathered into one Counter in a single pass; the rows only look them up.
     """
     output_path = Path(root_dir) / "Summary_Index.md"
     content = [
@@ -59,33 +102,25 @@ def generate_summary_index(results: Dict[str, Any], root_dir: str):
         ""
     ]
     
-    total_sequences = 0
+    # (family, seq_type, chain_type) -> number of sequences, summed across all organisms
+    category_counts = Counter()
+    for family, organisms_data in results.items():
+        for seq_types in organisms_data.values():
+            for seq_type, chain_types in seq_types.items():
+                for chain_type, sequences in chain_types.items():
+                    category_counts[(family, seq_type, chain_type)] += len(sequences)
     
     # Start the detailed table
     content.append("## Detailed Sequence Counts by Family and Type")
     content.append("| Family Name | Total Found | Full (Heavy) | Full (Light) | Full (Other) | Partial (Heavy) | Partial (Light) | Partial (Other) |")
     content.append("| :--- | :---: | :---: | :---: | :---: | :---: | :---: | :---: |")
 
-    for family, organisms_data in sorted(results.items()):
-        
-        # Initialize counts for the current family by summing across all organisms
-        full_heavy, full_light, full_other, partial_heavy, partial_light, partial_other = 0, 0, 0, 0, 0, 0
-
-        for organism_name, seq_types in organisms_data.items():
-            full_heavy += len(seq_types['full sequence']['heavy chain'])
-            full_light += len(seq_types['full sequence']['light chain'])
-            full_other += len(seq_types['full sequence']['others'])
-            
-            partial_heavy += len(seq_types['partial sequence']['heavy chain'])
-            partial_light += len(seq_types['partial sequence']['light chain'])
-            partial_other += len(seq_types['partial sequence']['others'])
-        
-        family_total = sum([full_heavy, full_light, full_other, partial_heavy, partial_light, partial_other])
-        total_sequences += family_total
+    for family in sorted(results):
+        # Get counts for all six sub-categories, in table column order
+        counts = [category_counts[(family, seq_type, chain_type)] for seq_type, chain_type in SUMMARY_COLUMN_KEYS]
+        content.append(f"| {family} | **{sum(counts)}** | {' | '.join(map(str, counts))} |")
 
-        # Append row to the table
-        row = f"| {family} | **{family_total}** | {full_heavy} | {full_light} | {full_other} | {partial_heavy} | {partial_light} | {partial_other} |"
-        content.append(row)
+    total_sequences = sum(category_counts.values())
 
     content.append("")
     content.append("---")
@@ -93,8 +128,8 @@ def generate_summary_index(results: Dict[str, Any], root_dir: str):
     content.append(f"\nAll sequences are saved in the `{root_dir}` folder, organized hierarchically by Suborder, Superfamily, Family, **Organism**, Sequence Type, and Chain Type.")
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(content))
+        with open(output_path, 'wb') as f:
+            f.write('\n'.join(content).encode('utf-8'))
         print(f"Successfully generated summary index: {output_path}")
     except Exception as e:
         print(f"ERROR: Could not write summary index file: {e}")
@@ -112,7 +147,9 @@ def save_results_to_files(results: Dict[str, Any], path_map: Dict[str, Any]):
     root_dir = Path(OUTPUT_ROOT_DIR)
     root_dir.mkdir(exist_ok=True)
     
-    total_files_saved = 0
+    # Walk the results first without touching the disk: collect every directory and every file to write
+    directories = []
+    write_jobs = []
     
     for family, organisms_data in results.items():
         if not organisms_data:
@@ -122,70 +159,58 @@ def save_results_to_files(results: Dict[str, Any], path_map: Dict[str, Any]):
             print(f"WARNING: Skipping {family} - path information missing.")
             continue
             
-        # --- 1. Create Top Level Taxonomy directories (Suborder/Superfamily/Family) ---
+        # --- 1. Top Level Taxonomy directories (Suborder/Superfamily/Family) ---
         suborder_name = path_map[family]['suborder']
         superfamily_name = path_map[family]['superfamily']
 
-        # Path: ROOT/Suborder/Superfamily
-        superfamily_dir = root_dir / safe_filename(suborder_name) / safe_filename(superfamily_name)
-        superfamily_dir.mkdir(parents=True, exist_ok=True)
-
         # Path: ROOT/Suborder/Superfamily/Family
-        family_dir = superfamily_dir / safe_filename(family)
-        family_dir.mkdir(exist_ok=True)
-        print(f"  Organizing data for {family} in: {family_dir.relative_to(root_dir)}")
+        family_dir = root_dir / safe_filename(suborder_name) / safe_filename(superfamily_name) / safe_filename(family)
+        print(f"  Organizing data for {family} in: {family_dir.relative_to(root_dir)}")
         
         # --- 2. Iterate through Organism, Sequence Type and Chain Type ---
         for organism_name, org_data in organisms_data.items():
             
             # Path: Family/Organism
             organism_dir = family_dir / safe_filename(organism_name, 60) 
-            organism_dir.mkdir(exist_ok=True)
-            # print(f"    -> Processing Organism: {organism_name}")
 
             for seq_type, chain_types in org_data.items():
                 
                 type_dir = organism_dir / safe_filename(seq_type)
-                type_dir.mkdir(exist_ok=True)
                 
                 for chain_type, sequences in chain_types.items():
                     
+                    # Empty chain folders are still created, so every organism has the same layout
                     chain_dir = type_dir / safe_filename(chain_type)
-                    chain_dir.mkdir(exist_ok=True)
-                    
-                    if not sequences:
-                        continue
+                    directories.append(chain_dir)
                     
                     for data in sequences:
                         
                         # 1. Prepare FASTA Content
                         fasta_header = f">{data['id']} {data['name']}"
-                        fasta_sequence = '\n'.join([data['sequence'][i:i+60] for i in range(0, len(data['sequence']), 60)])
+                        fasta_sequence = wrap_fasta(data['sequence'])
                         fasta_content = f"{fasta_header}\n{fasta_sequence}\n"
                         
-                        # 2. Prepare Markdown Content
-                        markdown_content = generate_sequence_markdown(data, chain_type, seq_type)
+                        # 2. Prepare Markdown Content (reusing the wrapped lines)
+                        markdown_content = generate_sequence_markdown(data, chain_type, seq_type, fasta_sequence)
                         
                         # Generate a unique, safe filename using Accession ID
                         final_filename_base = f"{data['id']}_{safe_filename(data['name'], 30)}"
                         
-                        # Save FASTA file
-                        fasta_file_path = chain_dir / f"{final_filename_base}.fasta"
-                        try:
-                            with open(fasta_file_path, 'w', encoding='utf-8') as f:
-                                f.write(fasta_content)
-                            total_files_saved += 1
-                        except Exception as e:
-                            print(f"      ERROR: Could not write FASTA file {fasta_file_path.name}: {e}")
-
-                        # Save Markdown file
-                        markdown_file_path = chain_dir / f"{final_filename_base}.md"
-                        try:
-                            with open(markdown_file_path, 'w', encoding='utf-8') as f:
-                                f.write(markdown_content)
-                            total_files_saved += 1
-                        except Exception as e:
-                            print(f"      ERROR: Could not write Markdown file {markdown_file_path.name}: {e}")
+                        write_jobs.append((chain_dir / f"{final_filename_base}.fasta", fasta_content.encode('utf-8'), 'FASTA'))
+                        write_jobs.append((chain_dir / f"{final_filename_base}.md", markdown_content.encode('utf-8'), 'Markdown'))
+
+    # Create every directory up front, so the writer threads never race on mkdir
+    for directory in dict.fromkeys(directories):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    # File writes are I/O-bound, so a thread pool overlaps them
+    total_files_saved = 0
+    with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as executor:
+        for error in executor.map(write_output_file, write_jobs):
+            if error:
+                print(error)
+            else:
+                total_files_saved += 1
 
     # Generate the Index after saving all files
     generate_summary_index(results, OUTPUT_ROOT_DIR)
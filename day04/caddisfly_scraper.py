@@ -1,7 +1,27 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup, Tag
 from typing import Dict, List, Any
 import re
+import os
+import sys
+import time
+from pathlib import Path
+
+# lxml's C parser is much faster than the pure-Python html.parser; it is optional
+try:
+    from lxml import html as lxml_html
+    HTML_PARSER = 'lxml'
+except ImportError:
+    lxml_html = None
+    HTML_PARSER = 'html.parser'
+
+# requests-cache keeps the Wikipedia page on disk between runs; it is optional
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
 
 # --- Configuration ---
 WIKI_URL = "https://en.wikipedia.org/wiki/Caddisfly"
@@ -9,26 +29,134 @@ TAXONOMY_SECTION_ID = "TAXONOMY"
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
+CACHE_NAME = "caddisfly_cache"
+CACHE_EXPIRE_SECONDS = 86400 # The taxonomy rarely changes; re-download at most once a day
+PAGE_CACHE_FILE = Path(f"{CACHE_NAME}.html") # Used when requests-cache is not installed
+
+# --- HTTP Session ---
+# One session reuses the connection to Wikipedia; only this session is cached,
+# so other modules' requests are left alone
+if requests_cache:
+    SESSION = requests_cache.CachedSession(CACHE_NAME, expire_after=CACHE_EXPIRE_SECONDS)
+else:
+    SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+# Transient Wikipedia errors are retried with backoff on the same pooled connection
+SESSION.mount('https://', HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])))
+
+# The first list after the Taxonomy <h2> that mentions a superfamily or suborder, found in one
+# XPath query (lxml only): the heading holds a span with a matching id, or names the section itself
+LOWERCASE_ID = "translate(@id, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+LOWERCASE_TEXT = "translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+SECTION_NAME = TAXONOMY_SECTION_ID.lower()
+TAXONOMY_LIST_XPATH = (
+    f"(//h2[.//span[contains({LOWERCASE_ID}, '{SECTION_NAME}')] or contains({LOWERCASE_TEXT}, '{SECTION_NAME}')])[1]"
+    "/following::*[self::dl or self::ul or self::ol or self::div]"
+    "[contains(., 'Superfamily') or contains(., 'Annulipalpia')][1]"
+)
+
+# --- Compiled Patterns ---
+TAXONOMY_ID_PATTERN = re.compile(TAXONOMY_SECTION_ID, re.IGNORECASE)
+# Footnote brackets, non-breaking spaces, middle dots and "edit" links
+CLEANUP_PATTERN = re.compile(r'\[[^\]\n]*\]|\xa0|·|\s*edit\s*', re.IGNORECASE)
+# The Taxonomy <h2> heading, and the start of the next section's heading
+TAXONOMY_HEADING_PATTERN = re.compile(rb'<h2\b(?:(?!</h2>).)*?' + TAXONOMY_SECTION_ID.encode() + rb'(?:(?!</h2>).)*?</h2>',
+                                      re.IGNORECASE | re.DOTALL)
+NEXT_HEADING_PATTERN = re.compile(rb'<h2\b', re.IGNORECASE)
+# A whole line starting with a rank keyword, and any whole non-empty line
+RANK_LINE_PATTERN = re.compile(r'^[^\S\n]*(?:suborder|superfamily|family).*$', re.IGNORECASE | re.MULTILINE)
+NON_EMPTY_LINE_PATTERN = re.compile(r'^[^\S\n]*\S.*$', re.MULTILINE)
+STREAM_CHUNK_SIZE = 16384
+STREAM_OVERLAP = 1024  # Bytes re-scanned so a heading split across chunks is still found
 
 # --- Web Scraping Function (Confirmed Working) ---
 
+def read_until_taxonomy_end(response) -> bytes:
+    """
+    Reads a streamed response only up to the heading that follows the Taxonomy section.
+    Returns the whole page if the section (or its end) is never found.
+    """
+    buffer = bytearray()
+    section_end = None
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+        scan_from = max(len(buffer) - STREAM_OVERLAP, 0)
+        buffer += chunk
+
+        if section_end is None:
+            heading = TAXONOMY_HEADING_PATTERN.search(buffer, scan_from)
+            if not heading:
+                continue
+            section_end = heading.end()
+
+        next_heading = NEXT_HEADING_PATTERN.search(buffer, max(scan_from, section_end))
+        if next_heading:
+            # Stop downloading; the rest of the page is never parsed
+            return bytes(buffer[:next_heading.start()])
+    return bytes(buffer)
+
+def read_cached_page() -> bytes:
+    """
+    Returns the Taxonomy section saved by an earlier run, or b'' if there is none or it has expired.
+    Only used without requests-cache, which otherwise caches the whole response itself.
+    """
+    try:
+        if time.time() - PAGE_CACHE_FILE.stat().st_mtime < CACHE_EXPIRE_SECONDS:
+            return PAGE_CACHE_FILE.read_bytes()
+    except OSError:
+        pass
+    return b''
+
+def write_cached_page(page_content: bytes):
+    """Saves the downloaded Taxonomy section for later runs (written to a temporary name, then renamed)."""
+    try:
+        temp_file = PAGE_CACHE_FILE.with_suffix('.tmp')
+        temp_file.write_bytes(page_content)
+        os.replace(temp_file, PAGE_CACHE_FILE)
+    except OSError:
+        pass
+
+def extract_taxonomy_text_xpath(page_content: bytes) -> str:
+    """
+    Finds the taxonomy list with a single lxml XPath query and returns its non-empty text lines.
+    Returns "" if lxml is not installed or the list is not found.
+    """
+    if lxml_html is None or not page_content:
+        return ""
+    matches = lxml_html.fromstring(page_content).xpath(TAXONOMY_LIST_XPATH)
+    if not matches:
+        return ""
+    return '\n'.join(line.strip() for text in matches[0].xpath('.//text()') for line in text.split('\n') if line.strip())
+
 def fetch_taxonomy_data(url: str) -> str:
     """
     Fetches the content of the specified URL and isolates the Taxonomy section's content.
     """
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status() 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        start_element = None
-        taxonomy_heading_span = soup.find('span', {'id': re.compile(TAXONOMY_SECTION_ID, re.IGNORECASE)})
-        
-        if taxonomy_heading_span:
-            start_element = taxonomy_heading_span.find_parent('h2')
+        page_content = b'' if requests_cache else read_cached_page()
+        if not page_content:
+            with SESSION.get(url, timeout=10, stream=True) as response:
+                response.raise_for_status() 
+                page_content = read_until_taxonomy_end(response)
+            if not requests_cache and TAXONOMY_HEADING_PATTERN.search(page_content):
+                write_cached_page(page_content)
+
+        # lxml: one C-level parse and one XPath query; BeautifulSoup below is the fallback
+        processed_data = extract_taxonomy_text_xpath(page_content)
+        if processed_data:
+            return processed_data
+
+        soup = BeautifulSoup(page_content, HTML_PARSER)
         
-        if not start_element:
-            start_element = soup.find('h2', string=lambda t: t and TAXONOMY_SECTION_ID.lower() in t.lower())
+        def is_taxonomy_heading(tag):
+            # An <h2> holding the section's id span, or whose own text names the section
+            if tag.name != 'h2':
+                return False
+            if tag.find('span', {'id': TAXONOMY_ID_PATTERN}):
+                return True
+            return bool(tag.string and TAXONOMY_SECTION_ID.lower() in tag.string.lower())
+
+        # One walk over the tree instead of a span search plus an <h2> fallback search
+        start_element = soup.find(is_taxonomy_heading)
         
         if not start_element:
             raise ValueError(f"Could not find the section '{TAXONOMY_SECTION_ID}' on the page.")
@@ -45,20 +173,21 @@ def fetch_taxonomy_data(url: str) -> str:
         if not content_container:
             # Fallback (The logic that worked for us previously)
             next_element = start_element.find_next_sibling()
-            raw_text_data = ""
+            text_parts = []
             while next_element and next_element.name not in ['h2', 'h3']:
                 if isinstance(next_element, Tag):
-                    raw_text_data += next_element.get_text(separator='\n', strip=True) + "\n"
+                    text_parts.append(next_element.get_text(separator='\n', strip=True))
                 next_element = next_element.find_next_sibling()
+            raw_text_data = '\n'.join(text_parts)
             
             if raw_text_data:
-                processed_data = '\n'.join([line.strip() for line in raw_text_data.split('\n') if line.strip()])
+                processed_data = '\n'.join(line.strip() for line in raw_text_data.split('\n') if line.strip())
                 return processed_data
             else:
                 raise ValueError("Could not extract any content block after the header.")
         
         raw_text_data = content_container.get_text(separator='\n', strip=True)
-        processed_data = '\n'.join([line.strip() for line in raw_text_data.split('\n') if line.strip()])
+        processed_data = '\n'.join(line.strip() for line in raw_text_data.split('\n') if line.strip())
         
         if "Superfamily" not in processed_data and "Annulipalpia" not in processed_data:
              raise ValueError("Extracted content is too short or lacks expected taxonomy markers.")
@@ -78,26 +207,28 @@ def parse_trichoptera_data(raw_text: str) -> Dict[str, Dict[str, List[str]]]:
     TRICHOPTERA_FAMILIES = {}
     current_suborder = None
     current_superfamily = None
+    seen_families = set()  # (suborder, superfamily, family) already added
     
-    cleaned_text = re.sub(r'\[.*?\]|\xa0|·|\s*edit\s*', '', raw_text, flags=re.IGNORECASE)
-    lines = cleaned_text.split('\n')
+    # One '\n' per line break, so the MULTILINE patterns see the same lines as str.splitlines()
+    cleaned_text = '\n'.join(CLEANUP_PATTERN.sub('', raw_text).splitlines())
+    resume_at = 0  # End of the last line read as a name, which is not a rank line itself
     
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        i += 1 
-        if not line:
+    # Only the rank lines are visited; the regex engine skips everything in between
+    for rank_match in RANK_LINE_PATTERN.finditer(cleaned_text):
+        if rank_match.start() < resume_at:
             continue
-            
+        line = rank_match.group().strip()
         line_lower = line.lower()
+        # The following non-empty line, which holds the name when it is not on the rank line
+        name_match = NON_EMPTY_LINE_PATTERN.search(cleaned_text, rank_match.end())
         
         if line_lower.startswith("suborder"):
             current_suborder = None
             if len(line.split()) > 1:
                 current_suborder = line.split(maxsplit=1)[1].strip()
-            elif i < len(lines):
-                current_suborder = lines[i].strip()
-                i += 1 
+            elif name_match:
+                current_suborder = name_match.group().strip()
+                resume_at = name_match.end()
             
             if current_suborder and current_suborder not in TRICHOPTERA_FAMILIES:
                 TRICHOPTERA_FAMILIES[current_suborder] = {}
@@ -111,10 +242,9 @@ def parse_trichoptera_data(raw_text: str) -> Dict[str, Dict[str, List[str]]]:
                 superfamily_name = line.split(maxsplit=1)[1].strip()
                 current_superfamily = superfamily_name
                         
-            elif i < len(lines):
-                superfamily_base_name = lines[i].strip()
-                current_superfamily = superfamily_base_name
-                i += 1 
+            elif name_match:
+                current_superfamily = name_match.group().strip()
+                resume_at = name_match.end()
 
             if current_superfamily and is_fossil_rank and '†' not in current_superfamily:
                  current_superfamily += '†'
@@ -124,27 +254,40 @@ def parse_trichoptera_data(raw_text: str) -> Dict[str, Dict[str, List[str]]]:
                     TRICHOPTERA_FAMILIES[current_suborder][current_superfamily] = []
         
         elif line_lower.startswith("family"):
-            if i < len(lines) and current_suborder and current_superfamily:
-                family_base_name = lines[i].strip()
+            if name_match and current_suborder and current_superfamily:
+                family_base_name = name_match.group().strip()
                 family_name = family_base_name
                 is_fossil_rank = '†' in line
                 
                 if is_fossil_rank and '†' not in family_name:
                     family_name = family_base_name + '†'
                 
-                if family_name not in TRICHOPTERA_FAMILIES[current_suborder][current_superfamily]:
+                family_key = (current_suborder, current_superfamily, family_name)
+                if family_key not in seen_families:
+                    seen_families.add(family_key)
                     TRICHOPTERA_FAMILIES[current_suborder][current_superfamily].append(family_name)
                     
-                i += 1
+                resume_at = name_match.end()
     return TRICHOPTERA_FAMILIES
 
 # --- NEW EXPORT FUNCTION (Used by ncbi_fibroin_scraper.py) ---
 
+# Extant taxonomy from the first successful fetch; stays empty after a failure so the next call retries
+_EXTANT_TAXONOMY: Dict[str, Dict[str, List[str]]] = {}
+
 def get_trichoptera_taxonomy_structure() -> Dict[str, Dict[str, List[str]]]:
     """
     Public function to fetch and return the structured taxonomy data,
     excluding fossil suborders, superfamilies, and families ('†' marker).
+    Only a successful fetch is kept for the process; each caller gets its own copy.
     """
+    if not _EXTANT_TAXONOMY:
+        _EXTANT_TAXONOMY.update(_fetch_extant_taxonomy())
+    return {suborder: {superfamily: list(families) for superfamily, families in superfamilies.items()}
+            for suborder, superfamilies in _EXTANT_TAXONOMY.items()}
+
+def _fetch_extant_taxonomy() -> Dict[str, Dict[str, List[str]]]:
+    """Downloads and parses the taxonomy, dropping fossil entries. Returns {} if the fetch fails."""
     raw_content = fetch_taxonomy_data(WIKI_URL)
     if not raw_content:
         print("WARNING: Scraper failed to fetch new data.")
@@ -189,13 +332,13 @@ def get_caddisfly_family_names() -> List[str]:
         return ['Hydropsychidae', 'Limnephilidae', 'Hydroptilidae', 'Leptoceridae']
 
     # Extract only extant families (already filtered by get_trichoptera_taxonomy_structure)
-    extant_families = []
+    extant_families = set()
     for suborders in structured_data.values():
         for families in suborders.values():
-            extant_families.extend(families) # No need to filter '†' again
+            extant_families.update(families) # No need to filter '†' again
             
     # Return unique extant names
-    return sorted(list(set(extant_families)))
+    return sorted(extant_families)
 
 # If run directly, still print the results (optional for convenience)
 if __name__ == "__main__":
@@ -209,29 +352,33 @@ if __name__ == "__main__":
         
         # Helper function for printing (copied from previous iterations)
         def print_families_by_suborder(structured_data: Dict[str, Any]):
-            print("\n" + "="*70)
-            print("--- EXTRACTED FAMILIES OF THE ORDER TRICHOPTERA (Caddisflies) ---")
-            print("="*70)
-            all_families = sorted(list(set(f for suborders in structured_data.values() for families in suborders.values() for f in families)))
+            # The report is collected line by line and written to stdout in one call
+            report = []
+            add = report.append
+            add("\n" + "="*70)
+            add("--- EXTRACTED FAMILIES OF THE ORDER TRICHOPTERA (Caddisflies) ---")
+            add("="*70)
+            all_families = sorted({f for suborders in structured_data.values() for families in suborders.values() for f in families})
             total_families = len(all_families)
-            print(f"\nTotal families extracted: {total_families}\n")
+            add(f"\nTotal families extracted: {total_families}\n")
             
             for suborder, superfamilies in structured_data.items():
-                print(f"[{suborder.upper()}]")
+                add(f"[{suborder.upper()}]")
                 for superfamily, families in superfamilies.items():
                     extant_families = [f for f in families if '†' not in f]
                     fossil_families = [f for f in families if '†' in f]
                     display_superfamily = superfamily.rstrip('†').strip()
-                    print(f"  Superfamily: {display_superfamily} (Total: {len(families)})")
+                    add(f"  Superfamily: {display_superfamily} (Total: {len(families)})")
                     if extant_families:
-                        print(f"    Extant Families: {', '.join(extant_families)}")
+                        add(f"    Extant Families: {', '.join(extant_families)}")
                     if fossil_families:
                         cleaned_fossils = [f.rstrip('†').strip() for f in fossil_families]
-                        print(f"    Fossil Families: {', '.join(cleaned_fossils)}")
-                print("-" * 70)
+                        add(f"    Fossil Families: {', '.join(cleaned_fossils)}")
+                add("-" * 70)
                 
-            print("\n--- Flat List of All Families ---")
-            print(all_families)
+            add("\n--- Flat List of All Families ---")
+            add(str(all_families))
+            sys.stdout.write('\n'.join(report) + '\n')
 
         print_families_by_suborder(structured_data)
     else:
@@ -1,10 +1,21 @@
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Tuple, Any
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import List, Dict, Tuple, Any, Iterable, Iterator
 import re
 import os
 from pathlib import Path
 import time
+import shelve
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from ncbi_shared import SUMMARY_COLUMN_KEYS, RateLimiter, create_session, wrap_fasta
+
+# lxml's C parser is much faster than the pure-Python html.parser; it is optional
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
 # Use the new nested function for scraping the taxonomy
 try:
@@ -17,12 +28,17 @@ except ImportError:
 # --- Configuration ---
 NCBI_BASE_URL = "https://www.ncbi.nlm.nih.gov/protein/"
 NCBI_EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
 FIBROIN_TERM = "fibroin"
+# Only links into /protein/ can carry an accession ID, so the search page parser builds nothing else
+PROTEIN_LINK_STRAINER = SoupStrainer('a', href=lambda href: href and '/protein/' in href)
+EFETCH_PARAMS = {'db': 'protein', 'rettype': 'fasta', 'retmode': 'text'} # Shared by every Efetch call; only 'id' changes
 OUTPUT_ROOT_DIR = "ncbi_fibroin_sequences" # Root folder for all output
-SLEEP_TIME = 0.5 # Pause between API calls to be polite
+REQUESTS_PER_SECOND = 3 # NCBI's rate limit without an API key, shared by all workers
+MAX_FETCH_WORKERS = 8 # Concurrent sequence downloads
+EFETCH_BATCH_SIZE = 200 # Accession IDs per batch Efetch call
+MAX_FAMILY_WORKERS = 4 # Family searches run at the same time
+CHECKPOINT_FILE = ".ncbi_checkpoint" # Completed family downloads, reused by later runs
+CHECKPOINT_MAX_AGE_SECONDS = 7 * 24 * 3600 # Older checkpoint entries are downloaded again
 
 # --- Classification Constants ---
 CHAIN_TYPES = {
@@ -33,11 +49,23 @@ CHAIN_TYPES = {
 # The final result structure will now be keyed by Family -> Organism -> Sequence Type -> Chain Type
 # {Family: {Organism: {'full sequence': {'heavy chain': [data...], ...}, 'partial sequence': {...}}}}
 
+# Every byte that is not an (upper-case) residue letter or stop '*', deleted from FASTA bodies with bytes.translate
+NON_RESIDUE_BYTES = bytes(b for b in range(256) if not (ord('A') <= b <= ord('Z') or b == ord('*')))
+
+# --- Compiled Patterns ---
+UNSAFE_FILENAME_PATTERN = re.compile(r'[\\/:*?"<>|]') # Characters not allowed in file names
+ORGANISM_PATTERN = re.compile(r'\[(.*?)\]$') # Content inside the last pair of square brackets
+ACCESSION_PATTERN = re.compile(r'/protein/([A-Z]{1,3}\d+\.?\d*)') # Accession ID in a search result link
+
+# --- Request Pacing & HTTP Session (shared with business_logic_and_UI, see ncbi_shared.py) ---
+LIMITER = RateLimiter(REQUESTS_PER_SECOND)
+SESSION = create_session(pool_connections=4, pool_maxsize=32)
+
 # --- Utility Functions ---
 
 def safe_filename(name: str, max_len=50) -> str:
     """Generates a safe filename/directory name from a string."""
-    safe_name = re.sub(r'[\\/:*?"<>|]', '', name).strip()
+    safe_name = UNSAFE_FILENAME_PATTERN.sub('', name).strip()
     # Normalize spaces and hyphens to underscores, remove dots
     safe_name = safe_name.replace(' ', '_').replace('-', '_').replace('.', '_').lower()
     return safe_name[:max_len]
@@ -64,7 +92,7 @@ def extract_organism_name(protein_name: str) -> str:
     If the name is not found in brackets, it returns a default "Unknown Organism".
     """
     # Regex to find content inside the last pair of square brackets
-    match = re.search(r'\[(.*?)\]$', protein_name.strip())
+    match = ORGANISM_PATTERN.search(protein_name.strip())
     if match:
         organism = match.group(1).strip()
         # Ensure the extracted name is meaningful (e.g., not just an abbreviation)
@@ -75,35 +103,42 @@ def extract_organism_name(protein_name: str) -> str:
     return "Unknown Organism"
 
 
+def parse_fasta_lines(lines: Iterable[bytes]) -> Iterator[Tuple[str, str]]:
+    """
+    Parses FASTA text line by line and yields (accession ID, sequence) for each record.
+    Only the record being read is held in memory, so a streamed response is never buffered whole.
+    """
+    accession_id = None
+    sequence_buffer = bytearray()
+    for line in lines:
+        if line.startswith(b'>'):
+            if accession_id is not None:
+                yield accession_id, sequence_buffer.decode('ascii')
+            # The first word of the header line is the accession ID
+            header = line[1:].split(maxsplit=1)
+            accession_id = header[0].decode('ascii', 'replace') if header else ''
+            sequence_buffer = bytearray()
+        elif accession_id is not None:
+            # Remove any non-standard amino acid characters in one C-level pass (no regex engine)
+            sequence_buffer += line.upper().translate(None, NON_RESIDUE_BYTES)
+    if accession_id is not None:
+        yield accession_id, sequence_buffer.decode('ascii')
+
+
 # --- Core Scraper Functions ---
 
 def fetch_protein_sequence(accession_id: str) -> str:
     """
     Fetches the protein sequence using NCBI E-utilities (Efetch) for reliable FASTA output.
     """
-    params = {
-        'db': 'protein',
-        'id': accession_id,
-        'rettype': 'fasta',
-        'retmode': 'text'
-    }
+    params = {**EFETCH_PARAMS, 'id': accession_id}
     
     try:
-        response = requests.get(NCBI_EUTILS_BASE_URL, headers=HEADERS, params=params, timeout=15)
-        response.raise_for_status()
-        content = response.text.strip()
-
-        if not content.startswith('>'):
-            return ""
-
-        first_newline_index = content.find('\n')
-        
-        if first_newline_index == -1:
-            return ""
-
-        sequence_body = content[first_newline_index + 1:].upper()
-        # Remove any non-standard amino acid characters (like 'X' or 'B' sometimes used as placeholders)
-        sequence = re.sub(r'[^A-Z*]', '', sequence_body) 
+        LIMITER.acquire()
+        with SESSION.get(NCBI_EUTILS_BASE_URL, params=params, timeout=15, stream=True) as response:
+            response.raise_for_status()
+            # The sequence of the first (only) record, or "" if the reply is not FASTA
+            _, sequence = next(parse_fasta_lines(response.iter_lines()), (None, ""))
             
         return sequence
 
@@ -115,6 +150,32 @@ def fetch_protein_sequence(accession_id: str) -> str:
         return ""
 
 
+def fetch_protein_sequences_batch(accession_ids: List[str]) -> Dict[str, str]:
+    """
+    Fetches many protein sequences with one Efetch call and returns them keyed by accession ID.
+    Both the versioned ('BAF62092.2') and unversioned ('BAF62092') accession are keys, since the
+    search page may list either form. Returns an empty dict on failure.
+    """
+    data = {**EFETCH_PARAMS, 'id': ','.join(accession_ids)}
+
+    try:
+        # POST so a long ID list does not overflow the URL
+        LIMITER.acquire()
+        sequences = {}
+        # Records are parsed as the response streams in, one at a time
+        with SESSION.post(NCBI_EUTILS_BASE_URL, data=data, timeout=60, stream=True) as response:
+            response.raise_for_status()
+            for accession_id, sequence in parse_fasta_lines(response.iter_lines()):
+                if not accession_id or not sequence:
+                    continue
+                sequences[accession_id] = sequence
+                sequences.setdefault(accession_id.split('.')[0], sequence)
+        return sequences
+    except requests.exceptions.RequestException as e:
+        print(f"      ERROR: Could not fetch {len(accession_ids)} sequences using E-utilities: {e}")
+        return {}
+
+
 def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
     """
     Searches NCBI Protein database and extracts accession ID and name for each result.
@@ -122,9 +183,9 @@ def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
     """
     search_url = f"{NCBI_BASE_URL}?term={query}"
     
-    print(f"    Searching NCBI for: '{query}'...")
     try:
-        response = requests.get(search_url, headers=HEADERS, timeout=15)
+        LIMITER.acquire()
+        response = SESSION.get(search_url, timeout=15)
         response.raise_for_status()
         
         # --- IMPROVEMENT: Explicitly check for NCBI's "Term not found" message ---
@@ -133,11 +194,11 @@ def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
             print(f"    WARNING: NCBI explicitly reported 'Term not found' for '{query}'. Skipping download.")
             return []
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # The tree holds only the /protein/ links (no selector pass needed afterwards)
+        soup = BeautifulSoup(response.content, HTML_PARSER, parse_only=PROTEIN_LINK_STRAINER)
         
         results = set()
-        # Look for various common result link classes and structures
-        title_links = soup.select('a.pr-link, a.title, a[href^="/protein/"], a[data-entity-id]')
+        title_links = soup.find_all('a')
 
         for link in title_links:
             href = link.get('href')
@@ -145,7 +206,7 @@ def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
             
             if href and protein_name:
                 # Regex to extract accession ID (e.g., AAN02787.1)
-                match = re.search(r'/protein/([A-Z]{1,3}\d+\.?\d*)', href)
+                match = ACCESSION_PATTERN.search(href)
                 
                 if match:
                     accession_id = match.group(1)
@@ -163,6 +224,27 @@ def fetch_and_parse_search_results(query: str) -> List[Tuple[str, str]]:
         return []
 
 
+def fetch_protein_sequences(accession_ids: List[str]) -> Dict[str, str]:
+    """
+    Fetches every given sequence: batch Efetch calls of up to EFETCH_BATCH_SIZE IDs, then
+    single-record fetches for anything the batches missed.
+    Returns the sequences keyed by accession ID ('' where a fetch failed).
+    """
+    id_iterator = iter(accession_ids)
+    batches = list(iter(lambda: list(islice(id_iterator, EFETCH_BATCH_SIZE)), []))
+
+    fetched_sequences = {}
+    # Batches and single records are downloaded concurrently (LIMITER keeps the workers within NCBI's rate limit)
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+        for batch_sequences in executor.map(fetch_protein_sequences_batch, batches):
+            fetched_sequences.update(batch_sequences)
+
+        missing_ids = [record_id for record_id in accession_ids if record_id not in fetched_sequences]
+        fetched_sequences.update(zip(missing_ids, executor.map(fetch_protein_sequence, missing_ids)))
+
+    return fetched_sequences
+
+
 def main_scraper() -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
     Executes the full scraping process based on the nested taxonomy structure.
@@ -201,71 +283,104 @@ def main_scraper() -> Tuple[Dict[str, Any], Dict[str, Any]]:
                 family_to_path[family] = {'suborder': suborder, 'superfamily': superfamily}
                 
     
-    for family in families_to_process:
-        print(f"Step 2: Processing Family: {family}")
-        search_query = f"{family} {FIBROIN_TERM}"
-        
-        # Initialize storage for the current family, keyed by organism name
-        final_results[family] = {}
+    # Families completed by a recent run are read from the checkpoint file
+    # (the shelf is only touched from this thread)
+    with shelve.open(CHECKPOINT_FILE) as checkpoint:
+        checkpointed = {}
+        for family in families_to_process:
+            entry = checkpoint.get(f"{family}|{FIBROIN_TERM}")
+            if entry and time.time() - entry['saved_at'] < CHECKPOINT_MAX_AGE_SECONDS:
+                checkpointed[family] = entry['downloads']
+        families_to_fetch = [family for family in families_to_process if family not in checkpointed]
+
+        # 1. The remaining families are searched concurrently over the shared session
+        search_queries = [f"{family} {FIBROIN_TERM}" for family in families_to_fetch]
+        for query in search_queries:
+            print(f"    Searching NCBI for: '{query}'...")
+        with ThreadPoolExecutor(max_workers=MAX_FAMILY_WORKERS) as family_executor:
+            family_searches = family_executor.map(fetch_and_parse_search_results, search_queries)
+            family_records = dict(zip(families_to_fetch, family_searches))
+
+        # 2. An accession found by several families is downloaded only once
+        unique_ids = list(dict.fromkeys(
+            record_id for protein_records in family_records.values() for record_id, _ in protein_records
+        ))
+        all_sequences = fetch_protein_sequences(unique_ids) if unique_ids else {}
+
+        # 3. Every family is classified in order from the downloaded sequences, without more network calls
+        for family in families_to_process:
+            if family in checkpointed:
+                protein_records, fetched_sequences = checkpointed[family]
+            else:
+                protein_records = family_records[family]
+                fetched_sequences = {record_id: all_sequences[record_id] for record_id, _ in protein_records}
+                # Only complete downloads are saved: a family whose search found nothing (or failed)
+                # or that is missing a sequence is tried again next run
+                if protein_records and all(fetched_sequences[record_id] for record_id, _ in protein_records):
+                    checkpoint[f"{family}|{FIBROIN_TERM}"] = {
+                        'saved_at': time.time(),
+                        'downloads': (protein_records, fetched_sequences)
+                    }
+
+            print(f"Step 2: Processing Family: {family}")
+            print(f"    Results for: '{family} {FIBROIN_TERM}'{' (from checkpoint)' if family in checkpointed else ''}")
         
-        protein_records = fetch_and_parse_search_results(search_query)
+            # Initialize storage for the current family, keyed by organism name
+            final_results[family] = {}
         
-        if not protein_records:
-            print(f"    No protein records found for {family}.")
-            print("-" * 40)
-            continue
+            if not protein_records:
+                print(f"    No protein records found for {family}.")
+                print("-" * 40)
+                continue
             
-        print(f"    Found {len(protein_records)} records. Fetching sequences...")
+            print(f"    Found {len(protein_records)} records. Fetching sequences...")
 
-        for record_id, record_name in protein_records:
-            time.sleep(SLEEP_TIME) 
-            
-            sequence = fetch_protein_sequence(record_id)
-            
-            if not sequence:
-                continue
+            for record_id, record_name in protein_records:
+                sequence = fetched_sequences[record_id]
+                if not sequence:
+                    continue
 
-            # 0. Extract Organism Name (NEW STEP)
-            organism_name = extract_organism_name(record_name)
+                # 0. Extract Organism Name (NEW STEP)
+                organism_name = extract_organism_name(record_name)
             
-            # Initialize organism storage if new
-            if organism_name not in final_results[family]:
-                final_results[family][organism_name] = {
-                    'full sequence': {k: [] for k in CHAIN_TYPES.keys()},
-                    'partial sequence': {k: [] for k in CHAIN_TYPES.keys()}
-                }
-
-            # 1. Determine sequence type (Full or Partial)
-            is_partial = 'partial' in record_name.lower()
-            seq_type = 'partial sequence' if is_partial or '*' in sequence else 'full sequence'
+                # Initialize organism storage if new
+                if organism_name not in final_results[family]:
+                    final_results[family][organism_name] = {
+                        'full sequence': {k: [] for k in CHAIN_TYPES.keys()},
+                        'partial sequence': {k: [] for k in CHAIN_TYPES.keys()}
+                    }
+
+                # 1. Determine sequence type (Full or Partial)
+                is_partial = 'partial' in record_name.lower()
+                seq_type = 'partial sequence' if is_partial or '*' in sequence else 'full sequence'
             
-            # 2. Determine chain type (Heavy, Light, Other)
-            chain_type = classify_protein_chain(record_name)
+                # 2. Determine chain type (Heavy, Light, Other)
+                chain_type = classify_protein_chain(record_name)
             
-            sequence_data = {
-                'id': record_id,
-                'name': record_name,
-                'organism': organism_name, # Include organism in data
-                'sequence': sequence
-            }
+                sequence_data = {
+                    'id': record_id,
+                    'name': record_name,
+                    'organism': organism_name, # Include organism in data
+                    'sequence': sequence
+                }
             
-            # Save data into the correct nested list: family -> organism -> seq_type -> chain_type
-            final_results[family][organism_name][seq_type][chain_type].append(sequence_data)
+                # Save data into the correct nested list: family -> organism -> seq_type -> chain_type
+                final_results[family][organism_name][seq_type][chain_type].append(sequence_data)
         
-        # Calculate counts for the family by iterating over all organisms in it
-        full_count = sum(
-            len(v) 
-            for org_data in final_results[family].values() 
-            for v in org_data['full sequence'].values()
-        )
-        partial_count = sum(
-            len(v) 
-            for org_data in final_results[family].values() 
-            for v in org_data['partial sequence'].values()
-        )
+            # Calculate counts for the family by iterating over all organisms in it
+            full_count = sum(
+                len(v) 
+                for org_data in final_results[family].values() 
+                for v in org_data['full sequence'].values()
+            )
+            partial_count = sum(
+                len(v) 
+                for org_data in final_results[family].values() 
+                for v in org_data['partial sequence'].values()
+            )
         
-        print(f"    Finished {family}. Results: Total found ({full_count + partial_count}), Full ({full_count}), Partial ({partial_count}).")
-        print("-" * 40)
+            print(f"    Finished {family}. Results: Total found ({full_count + partial_count}), Full ({full_count}), Partial ({partial_count}).")
+            print("-" * 40)
             
     # Return the classified data and the taxonomy path map
     return final_results, family_to_path
@@ -273,10 +388,13 @@ def main_scraper() -> Tuple[Dict[str, Any], Dict[str, Any]]:
 
 # --- Output Generation Functions ---
 
-def generate_sequence_markdown(data: Dict[str, str], chain_type: str, seq_type: str) -> str:
-    """Creates human-readable Markdown content for a single sequence file."""
+def generate_sequence_markdown(data: Dict[str, str], chain_type: str, seq_type: str, wrapped: str = None) -> str:
+    """
+    Creates human-readable Markdown content for a single sequence file.
+    Pass the already wrapped FASTA lines as `wrapped` to avoid wrapping the sequence again.
+    """
     
-    sequence_lines = '\n'.join([data['sequence'][i:i+60] for i in range(0, len(data['sequence']), 60)])
+    sequence_lines = wrapped if wrapped is not None else wrap_fasta(data['sequence'])
     
     return f"""# Fibroin Sequence Details
 
@@ -324,24 +442,16 @@ def generate_summary_index(results: Dict[str, Any], root_dir: str):
 
     for family, organisms_data in sorted(results.items()):
         
-        # Initialize counts for the current family by summing across all organisms
-        full_heavy, full_light, full_other, partial_heavy, partial_light, partial_other = 0, 0, 0, 0, 0, 0
-
-        for organism_name, seq_types in organisms_data.items():
-            full_heavy += len(seq_types['full sequence']['heavy chain'])
-            full_light += len(seq_types['full sequence']['light chain'])
-            full_other += len(seq_types['full sequence']['others'])
-            
-            partial_heavy += len(seq_types['partial sequence']['heavy chain'])
-            partial_light += len(seq_types['partial sequence']['light chain'])
-            partial_other += len(seq_types['partial sequence']['others'])
-        
-        family_total = sum([full_heavy, full_light, full_other, partial_heavy, partial_light, partial_other])
+        # Counts for the six sub-categories in table column order, summed across all organisms
+        counts = [
+            sum(len(seq_types[seq_type][chain_type]) for seq_types in organisms_data.values())
+            for seq_type, chain_type in SUMMARY_COLUMN_KEYS
+        ]
+        family_total = sum(counts)
         total_sequences += family_total
 
         # Append row to the table
-        row = f"| {family} | **{family_total}** | {full_heavy} | {full_light} | {full_other} | {partial_heavy} | {partial_light} | {partial_other} |"
-        content.append(row)
+        content.append(f"| {family} | **{family_total}** | {' | '.join(map(str, counts))} |")
 
     content.append("")
     content.append("---")
@@ -414,11 +524,11 @@ def save_results_to_files(results: Dict[str, Any], path_map: Dict[str, Any]):
                         # 1. Prepare FASTA Content
                         fasta_header = f">{data['id']} {data['name']}"
                         # Sequence split into lines of 60 characters
-                        fasta_sequence = '\n'.join([data['sequence'][i:i+60] for i in range(0, len(data['sequence']), 60)])
+                        fasta_sequence = wrap_fasta(data['sequence'])
                         fasta_content = f"{fasta_header}\n{fasta_sequence}\n"
                         
                         # 2. Prepare Markdown Content
-                        markdown_content = generate_sequence_markdown(data, chain_type, seq_type)
+                        markdown_content = generate_sequence_markdown(data, chain_type, seq_type, fasta_sequence)
                         
                         # Generate a unique, safe filename using Accession ID
                         final_filename_base = f"{data['id']}_{safe_filename(data['name'], 30)}"
@@ -0,0 +1,71 @@
+"""
+Helpers shared by ncbi_fibroin_scraper.py and the business_logic_and_UI modules:
+request pacing, the pooled HTTP session and FASTA/summary formatting.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import re
+import time
+import threading
+
+# --- Configuration ---
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+# Column order of the per-family counts in the summary index
+SUMMARY_COLUMN_KEYS = [
+    ('full sequence', 'heavy chain'),
+    ('full sequence', 'light chain'),
+    ('full sequence', 'others'),
+    ('partial sequence', 'heavy chain'),
+    ('partial sequence', 'light chain'),
+    ('partial sequence', 'others'),
+]
+# Each full 60-residue FASTA line, so a newline can be inserted after it in one substitution
+FASTA_LINE_PATTERN = re.compile(r'(.{60})')
+
+# --- Request Pacing ---
+
+class RateLimiter:
+    """
+    Spaces out request start times so that at most `requests_per_second` requests begin each second.
+    Thread-safe: every worker reserves the next free slot under a lock and sleeps until it arrives.
+    """
+    def __init__(self, requests_per_second: float):
+        self.min_interval = 1.0 / requests_per_second
+        self.next_ok = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until the caller may send its request."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_ok)
+            self.next_ok = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# --- HTTP Session ---
+
+def create_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    """
+    Returns a keep-alive session: connections to NCBI are reused instead of re-opened for every request,
+    and throttled (429) or transient server errors are retried with exponential backoff
+    (POST too, since batch Efetch calls only read data).
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount('https://', HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=None)
+    ))
+    return session
+
+# --- Formatting ---
+
+def wrap_fasta(sequence: str) -> str:
+    """Splits a sequence into 60-character FASTA lines in one regex pass."""
+    return FASTA_LINE_PATTERN.sub('\\1\n', sequence).rstrip('\n')
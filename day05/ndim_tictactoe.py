@@ -1,6 +1,16 @@
 import random
 import sys
 
+# NumPy is optional: it only speeds up the win check on larger boards
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:
+    np = None
+
+# Below this size building the arrays costs more than the pure-Python scan saves
+NUMPY_MIN_BOARD_SIZE = 5
+
 # --- Helper Functions for Input and Exit ---
 
 def get_valid_input(prompt, data_type, min_val=None, max_val=None):
@@ -57,11 +67,32 @@ def show_board(board, board_size):
 
 # --- Win Checking Logic ---
 
+def check_win_numpy(board, win_length, symbol):
+    """
+    Vectorized check_win: every length-'win_length' window along rows, columns and both
+    diagonals is summed at once over a 0/1 array of the player's cells.
+    """
+    cells = (np.array(board) == symbol).astype(np.int8)
+
+    # Rows and columns
+    if (sliding_window_view(cells, win_length, axis=1).sum(axis=-1) == win_length).any():
+        return True
+    if (sliding_window_view(cells, win_length, axis=0).sum(axis=-1) == win_length).any():
+        return True
+
+    # Both diagonals of every win_length x win_length square
+    squares = sliding_window_view(cells, (win_length, win_length))
+    if (squares.diagonal(axis1=-2, axis2=-1).sum(axis=-1) == win_length).any():
+        return True
+    return bool((squares[..., ::-1].diagonal(axis1=-2, axis2=-1).sum(axis=-1) == win_length).any())
+
 def check_win(board, board_size, win_length, symbol):
     """
     Checks if the current player (symbol) has a winning line of length 'win_length'.
     This logic is generalized for any board size and win length.
     """
+    if np is not None and board_size >= NUMPY_MIN_BOARD_SIZE:
+        return check_win_numpy(board, win_length, symbol)
     
     # 1. Check Rows and Columns
     for i in range(board_size):
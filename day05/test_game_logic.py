@@ -1,5 +1,8 @@
+import random
 import pytest
-from tic_tac_toe_business_logic import check_win_condition, check_draw_condition
+from tic_tac_toe_business_logic import check_win_condition, check_draw_condition, board_bits, has_winning_line, FULL_BOARD
+import tictactoe_game
+import ndim_tictactoe
 
 # --- Fixtures for Board States ---
 
@@ -89,4 +92,82 @@ def test_is_draw(draw_board):
 
 def test_is_not_draw(empty_board):
     """Tests that an empty board is not a draw."""
-    assert not check_draw_condition(empty_board)
\ No newline at end of file
+    assert not check_draw_condition(empty_board)
+
+# --- Tests for the Bitboard Helpers Used by the Game ---
+
+def test_board_bits_and_full_board(draw_board):
+    """Tests that X's and O's bits do not overlap and fill the board exactly on a draw."""
+    x_bits, o_bits = board_bits(draw_board, 'X'), board_bits(draw_board, 'O')
+    assert x_bits & o_bits == 0
+    assert x_bits | o_bits == FULL_BOARD
+    assert not has_winning_line(x_bits) and not has_winning_line(o_bits)
+
+def test_has_winning_line_needs_all_three():
+    """Tests that two marks of a line are not a win, and the third one is."""
+    assert not has_winning_line(0b000_000_011)
+    assert has_winning_line(0b000_000_111)
+
+def play_game(monkeypatch, moves):
+    """Plays tictactoe_game with Player 1 (X) first and the given (row, col) moves; returns the printed output."""
+    answers = iter(str(value) for move in moves for value in move)
+    monkeypatch.setattr(tictactoe_game.random, 'randint', lambda a, b: 1)
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    tictactoe_game.tic_tac_toe()
+
+def test_game_detects_win(monkeypatch, capsys):
+    """Tests that the game's incremental bitboard spots X completing the top row."""
+    play_game(monkeypatch, [(1, 1), (2, 1), (1, 2), (2, 2), (1, 3)])
+    output = capsys.readouterr().out
+    assert "Player 1 (X) is the winner" in output
+    assert "draw" not in output
+
+def test_game_detects_draw(monkeypatch, capsys):
+    """Tests that the game ends in a draw when the board fills without a line."""
+    play_game(monkeypatch, [(1, 1), (1, 2), (1, 3), (2, 2), (2, 1), (2, 3), (3, 2), (3, 1), (3, 3)])
+    output = capsys.readouterr().out
+    assert "It is a draw!" in output
+    assert "winner" not in output
+
+# --- Tests for the N x N NumPy Win Check ---
+
+def ndim_board(board_size, cells):
+    """Returns an empty N x N board with 'X' at the given (row, col) cells."""
+    board = [[' ' for _ in range(board_size)] for _ in range(board_size)]
+    for r, c in cells:
+        board[r][c] = 'X'
+    return board
+
+@pytest.mark.parametrize("board_size, win_length, cells, expected_win", [
+    (5, 4, [(2, 1), (2, 2), (2, 3), (2, 4)], True),            # Row
+    (6, 4, [(1, 5), (2, 5), (3, 5), (4, 5)], True),            # Column
+    (5, 5, [(0, 0), (1, 1), (2, 2), (3, 3), (4, 4)], True),    # Diagonal
+    (6, 3, [(1, 4), (2, 3), (3, 2)], True),                    # Anti-diagonal
+    (5, 4, [(0, 0), (0, 1), (0, 2), (1, 3), (2, 3), (3, 3), (3, 0), (2, 1)], False),  # Near misses only
+    (7, 4, [], False),                                          # Empty board
+], ids=["row", "column", "diagonal", "anti-diagonal", "no-win", "empty"])
+def test_check_win_numpy_matches_pure_python(monkeypatch, board_size, win_length, cells, expected_win):
+    """Tests that the NumPy win check agrees with the pure-Python scan on N >= 5 boards."""
+    pytest.importorskip("numpy")
+    board = ndim_board(board_size, cells)
+    assert ndim_tictactoe.check_win_numpy(board, win_length, 'X') == expected_win
+    assert ndim_tictactoe.check_win_numpy(board, win_length, 'O') is False
+    # Without NumPy check_win falls back to the pure-Python scan
+    monkeypatch.setattr(ndim_tictactoe, "np", None)
+    assert ndim_tictactoe.check_win(board, board_size, win_length, 'X') == expected_win
+
+def test_check_win_numpy_matches_pure_python_on_random_boards(monkeypatch):
+    """Tests the NumPy and pure-Python win checks against each other on many random boards."""
+    pytest.importorskip("numpy")
+    rng = random.Random(2024)
+    boards = []
+    for _ in range(300):
+        board_size = rng.randint(5, 8)
+        win_length = rng.randint(3, board_size)
+        board = [[rng.choice('XO  ') for _ in range(board_size)] for _ in range(board_size)]
+        boards.append((board, board_size, win_length))
+    numpy_results = [ndim_tictactoe.check_win_numpy(board, win_length, 'X') for board, _, win_length in boards]
+    monkeypatch.setattr(ndim_tictactoe, "np", None)
+    python_results = [ndim_tictactoe.check_win(*board_args, 'X') for board_args in boards]
+    assert numpy_results == python_results
+    assert any(numpy_results) and not all(numpy_results)
@@ -1,32 +1,37 @@
 # This file contains the logic extracted from the main game function
 # for testing purposes.
 
+# A player's marks as a 9-bit integer, bit (row * 3 + col) per square
+WIN_MASKS = (
+    0b000_000_111, 0b000_111_000, 0b111_000_000,  # rows
+    0b001_001_001, 0b010_010_010, 0b100_100_100,  # columns
+    0b100_010_001, 0b001_010_100,                 # diagonals
+)
+FULL_BOARD = 0b111_111_111
+
+def board_bits(board, symbol):
+    """
+    Packs the squares holding `symbol` into a 9-bit integer (bit row * 3 + col).
+    """
+    bits = 0
+    for r, row in enumerate(board):
+        for c, value in enumerate(row):
+            if value == symbol:
+                bits |= 1 << (r * 3 + c)
+    return bits
+
+def has_winning_line(bits):
+    """
+    Checks if a player's 9-bit marks contain three in a row, column, or diagonal
+    (all bits of one of the WIN_MASKS set).
+    """
+    return any(bits & mask == mask for mask in WIN_MASKS)
+
 def check_win_condition(board, symbol):
     """
     Checks if the given symbol has won the 3x3 game.
-    A win is three in a row, column, or diagonal.
-    """
-    board_size = 3
-    
-    # Check rows
-    for i in range(board_size):
-        if board[i][0] == symbol and board[i][1] == symbol and board[i][2] == symbol:
-            return True
-            
-    # Check columns
-    for j in range(board_size):
-        if board[0][j] == symbol and board[1][j] == symbol and board[2][j] == symbol:
-            return True
-    
-    # Check main diagonal (top-left to bottom-right)
-    if board[0][0] == symbol and board[1][1] == symbol and board[2][2] == symbol:
-        return True
-    
-    # Check anti-diagonal (top-right to bottom-left)
-    if board[0][2] == symbol and board[1][1] == symbol and board[2][0] == symbol:
-        return True
-
-    return False
+    """
+    return has_winning_line(board_bits(board, symbol))
 
 def check_draw_condition(board):
     """
@@ -1,5 +1,6 @@
 import random
-
+# Each player's marks are kept as a 9-bit integer, bit (row * 3 + col) per square
+from tic_tac_toe_business_logic import FULL_BOARD, has_winning_line
 
 def tic_tac_toe():
     board = [
@@ -8,6 +9,7 @@ def tic_tac_toe():
         [' ', ' ', ' ']
     ]
     board_size = 3  
+    player_bits = {'X': 0, 'O': 0}
 
 
     print("Welcome to Tic-Tac-Toe!")
@@ -51,6 +53,7 @@ def tic_tac_toe():
                     
                     if board[r][c] == ' ':
                         board[r][c] = symbol
+                        player_bits[symbol] |= 1 << (r * board_size + c)
                         break 
                     else:
                         print("That position is occupied. player {current_player} ({symbol}) pls choose again.")
@@ -61,36 +64,13 @@ def tic_tac_toe():
         
         show_board()
 
-        winner_found = False
-        
-        for i in range(board_size):
-            if board[i][0] == symbol and board[i][1] == symbol and board[i][2] == symbol:
-                winner_found = True
-                break
-                
-        if not winner_found:
-            for j in range(board_size):
-                if board[0][j] == symbol and board[1][j] == symbol and board[2][j] == symbol:
-                    winner_found = True
-                    break
-        
-        if not winner_found:
-            if board[0][0] == symbol and board[1][1] == symbol and board[2][2] == symbol:
-                winner_found = True
-        
-        if not winner_found:
-            if board[0][2] == symbol and board[1][1] == symbol and board[2][0] == symbol:
-                winner_found = True
+        winner_found = has_winning_line(player_bits[symbol])
 
         if winner_found:
             print(f" Player {current_player} ({symbol}) is the winner!! Congratulations!")
             game_over = True
         else:
-            is_draw = True
-            for row in board:
-                if ' ' in row:
-                    is_draw = False
-                    break
+            is_draw = (player_bits['X'] | player_bits['O']) == FULL_BOARD
                     
             if is_draw:
                 print("It is a draw!\n You both know how to play!\n Welldone!\n")